@@ -14,6 +14,7 @@ from pydantic import BaseModel, Field
 from app.database.db import get_db
 from app.services.cattle_service import CattleSimulationService
 from app.models.cattle import Cattle, HealthStatusEnum
+from app.tasks.background_tasks import background_manager
 
 
 # Configure logging
@@ -210,6 +211,7 @@ async def create_cattle(cattle_create: CattleCreate, db: Session = Depends(get_d
             latitude=cattle_create.latitude,
             longitude=cattle_create.longitude
         )
+        background_manager.notify_cattle_changed()
 
         return CattleResponse(**cattle.to_dict(include_location=True))
 
@@ -270,6 +272,7 @@ async def update_cattle(
 
         db.commit()
         db.refresh(cattle)
+        background_manager.notify_cattle_changed()
 
         return CattleResponse(**cattle.to_dict(include_location=True))
 
@@ -324,6 +327,7 @@ async def update_cattle_position(
         # Update position
         cattle.set_location(position_update.latitude, position_update.longitude)
         db.commit()
+        background_manager.notify_cattle_changed()
 
         return {"message": "Cattle position updated successfully"}
 
@@ -496,6 +500,7 @@ async def delete_cattle(cattle_id: str, db: Session = Depends(get_db)):
 
         if not success:
             raise HTTPException(status_code=404, detail="Cattle not found")
+        background_manager.notify_cattle_changed()
 
         return {"message": "Cattle deleted successfully"}
 
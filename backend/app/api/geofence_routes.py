@@ -14,6 +14,7 @@ from pydantic import BaseModel, Field
 from app.database.db import get_db
 from app.services.geofence_service import GeofenceService
 from app.models.geofence import Geofence
+from app.tasks.background_tasks import background_manager
 
 
 # Configure logging
@@ -160,6 +161,7 @@ async def create_geofence(geofence_create: GeofenceCreate, db: Session = Depends
             coordinates=geofence_create.coordinates,
             description=geofence_create.description
         )
+        background_manager.invalidate_geofence_cache()
 
         geofence_data = geofence.to_dict()
         return GeofenceResponse(**geofence_data)
@@ -205,6 +207,7 @@ async def update_geofence(
 
         if not success:
             raise HTTPException(status_code=404, detail="Geofence not found")
+        background_manager.invalidate_geofence_cache()
 
         # Get updated geofence
         geofence = db.query(Geofence).filter(Geofence.id == geofence_id).first()
@@ -244,6 +247,7 @@ async def activate_geofence(geofence_id: str, db: Session = Depends(get_db)):
 
         if not success:
             raise HTTPException(status_code=404, detail="Geofence not found")
+        background_manager.invalidate_geofence_cache()
 
         return {"message": "Geofence activated successfully"}
 
@@ -278,6 +282,7 @@ async def deactivate_geofence(geofence_id: str, db: Session = Depends(get_db)):
 
         if not success:
             raise HTTPException(status_code=404, detail="Geofence not found")
+        background_manager.invalidate_geofence_cache()
 
         return {"message": "Geofence deactivated successfully"}
 
@@ -526,6 +531,7 @@ async def delete_geofence(geofence_id: str, db: Session = Depends(get_db)):
         # Delete geofence
         db.delete(geofence)
         db.commit()
+        background_manager.invalidate_geofence_cache()
 
         return {"message": "Geofence deleted successfully"}
 
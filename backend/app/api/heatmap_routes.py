@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
@@ -76,7 +77,7 @@ async def get_heatmap_data(
         raise HTTPException(status_code=500, detail="Failed to generate heatmap data")
 
 
-@router.get("/geojson")
+@router.get("/geojson", response_class=ORJSONResponse)
 async def get_heatmap_geojson(
     hours_back: int = Query(24, ge=1, le=168, description="Number of hours to analyze"),
     grid_size_meters: float = Query(100, ge=10, le=500, description="Grid size in meters"),
@@ -99,7 +100,8 @@ async def get_heatmap_geojson(
         service = HeatmapService(db)
         geojson_data = service.get_heatmap_geojson(hours_back, grid_size_meters, intensity_scale)
 
-        return geojson_data
+        # Large FeatureCollections are serialized directly by orjson
+        return ORJSONResponse(geojson_data)
 
     except Exception as e:
         logger.error(f"Error generating heatmap GeoJSON: {e}")
@@ -175,6 +177,10 @@ async def get_movement_patterns(
 async def compare_periods(
     current_hours: int = Query(24, ge=1, le=168, description="Hours for current period"),
     previous_hours: int = Query(24, ge=1, le=168, description="Hours for previous period"),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90, description="Region of interest south bound"),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180, description="Region of interest west bound"),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90, description="Region of interest north bound"),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180, description="Region of interest east bound"),
     db: Session = Depends(get_db)
 ):
     """
@@ -183,14 +189,22 @@ async def compare_periods(
     Args:
         current_hours: Hours for current period (ending now)
         previous_hours: Hours for previous period (ending current_hours ago)
+        min_lat: Optional region of interest south bound
+        min_lng: Optional region of interest west bound
+        max_lat: Optional region of interest north bound
+        max_lng: Optional region of interest east bound
         db: Database session
 
     Returns:
         Dictionary with comparative analysis
     """
     try:
+        bbox = None
+        if None not in (min_lat, min_lng, max_lat, max_lng):
+            bbox = (min_lng, min_lat, max_lng, max_lat)
+
         service = HeatmapService(db)
-        comparison_data = service.compare_periods(current_hours, previous_hours)
+        comparison_data = service.compare_periods(current_hours, previous_hours, bbox)
 
         return comparison_data
 
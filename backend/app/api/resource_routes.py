@@ -3,16 +3,20 @@ Resource API Routes for Sumbawa Digital Ranch MVP
 Provides REST endpoints for resource management (water, feed, shelter)
 """
 import uuid
+import asyncio
 import logging
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from itertools import islice
+from typing import List, Optional, Dict, Any, Iterable, Iterator
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
 from app.database.db import get_db
-from app.services.resource_service import ResourceService
+from app.services.resource_service import ResourceService, resource_batch_loader
 from app.models.resource import Resource, ResourceTypeEnum
 
 
@@ -59,10 +63,34 @@ class ResourceResponse(BaseModel):
     updated_at: Optional[str]
 
 
+def _stream_json_array(items: Iterable[Any], chunk_size: int = 500) -> Iterator[bytes]:
+    """
+    Serialize items as one JSON array, encoding chunk_size items at a time
+
+    Args:
+        items: Iterable of orjson-serializable items
+        chunk_size: Number of items encoded per yielded chunk
+
+    Yields:
+        Byte chunks of the JSON array
+    """
+    iterator = iter(items)
+    separator = b''
+    yield b'['
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        # Strip the brackets orjson puts around each chunk to splice it into the outer array
+        yield separator + orjson.dumps(chunk)[1:-1]
+        separator = b','
+    yield b']'
+
+
 # API Endpoints
 
 
-@router.get("/", response_model=List[ResourceResponse])
+@router.get("/", response_model=List[ResourceResponse], response_class=StreamingResponse)
 async def get_all_resources(
     include_location: bool = Query(True, description="Include GPS coordinates"),
     include_metrics: bool = Query(False, description="Include usage metrics"),
@@ -83,12 +111,8 @@ async def get_all_resources(
         service = ResourceService(db)
         resources = service.get_all_resources(include_location, include_metrics)
 
-        # Convert to response model
-        response_data = []
-        for resource in resources:
-            response_data.append(ResourceResponse(**resource))
-
-        return response_data
+        # Stream the array while rows arrive from the server-side cursor
+        return StreamingResponse(_stream_json_array(resources), media_type="application/json")
 
     except Exception as e:
         logger.error(f"Error getting all resources: {e}")
@@ -131,7 +155,7 @@ async def get_resource_types(db: Session = Depends(get_db)):
     ]
 
 
-@router.get("/type/{resource_type}", response_model=List[ResourceResponse])
+@router.get("/type/{resource_type}", response_model=List[ResourceResponse], response_class=ORJSONResponse)
 async def get_resources_by_type(
     resource_type: str,
     include_location: bool = Query(True, description="Include GPS coordinates"),
@@ -152,12 +176,8 @@ async def get_resources_by_type(
         service = ResourceService(db)
         resources = service.get_resources_by_type(resource_type, include_location)
 
-        # Convert to response model
-        response_data = []
-        for resource in resources:
-            response_data.append(ResourceResponse(**resource))
-
-        return response_data
+        # ResourceDTO dataclasses are serialized directly by orjson
+        return ORJSONResponse(resources)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -171,8 +191,7 @@ async def get_nearby_resources(
     latitude: float = Query(..., ge=-90, le=90, description="Reference point latitude"),
     longitude: float = Query(..., ge=-180, le=180, description="Reference point longitude"),
     radius_meters: float = Query(500, ge=10, le=10000, description="Search radius in meters"),
-    resource_type: Optional[str] = Query(None, description="Filter by resource type"),
-    db: Session = Depends(get_db)
+    resource_type: Optional[str] = Query(None, description="Filter by resource type")
 ):
     """
     Get resources within specified radius from a point
@@ -182,16 +201,15 @@ async def get_nearby_resources(
         longitude: Reference point longitude
         radius_meters: Search radius in meters
         resource_type: Optional filter by resource type
-        db: Database session
 
     Returns:
         List of nearby resources with distance information
     """
     try:
-        service = ResourceService(db)
-        resources = service.get_resources_near_point(
+        # Concurrent nearby lookups are batched into one spatial query
+        resources = await asyncio.wrap_future(resource_batch_loader.load(
             latitude, longitude, radius_meters, resource_type
-        )
+        ))
 
         # Convert to response model
         response_data = []
@@ -205,6 +223,38 @@ async def get_nearby_resources(
         raise HTTPException(status_code=500, detail="Failed to retrieve nearby resources")
 
 
+@router.get("/nearby/exists")
+async def check_nearby_resource_exists(
+    latitude: float = Query(..., ge=-90, le=90, description="Reference point latitude"),
+    longitude: float = Query(..., ge=-180, le=180, description="Reference point longitude"),
+    radius_meters: float = Query(500, ge=10, le=10000, description="Search radius in meters"),
+    resource_type: Optional[str] = Query(None, description="Filter by resource type"),
+    db: Session = Depends(get_db)
+):
+    """
+    Check whether any resource exists within specified radius from a point
+
+    Args:
+        latitude: Reference point latitude
+        longitude: Reference point longitude
+        radius_meters: Search radius in meters
+        resource_type: Optional filter by resource type
+        db: Database session
+
+    Returns:
+        Whether at least one resource is within radius
+    """
+    try:
+        service = ResourceService(db)
+        exists = service.exists_resource_near_point(latitude, longitude, radius_meters, resource_type)
+
+        return {"exists": exists}
+
+    except Exception as e:
+        logger.error(f"Error checking nearby resources: {e}")
+        raise HTTPException(status_code=500, detail="Failed to check nearby resources")
+
+
 @router.get("/nearest")
 async def get_nearest_resource(
     latitude: float = Query(..., ge=-90, le=90, description="Reference point latitude"),
@@ -400,7 +450,7 @@ async def delete_resource(resource_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Failed to delete resource")
 
 
-@router.get("/water/all", response_model=List[ResourceResponse])
+@router.get("/water/all", response_model=List[ResourceResponse], response_class=ORJSONResponse)
 async def get_water_resources(
     include_location: bool = Query(True, description="Include GPS coordinates"),
     db: Session = Depends(get_db)
@@ -419,19 +469,15 @@ async def get_water_resources(
         service = ResourceService(db)
         resources = service.get_water_resources(include_location)
 
-        # Convert to response model
-        response_data = []
-        for resource in resources:
-            response_data.append(ResourceResponse(**resource))
-
-        return response_data
+        # ResourceDTO dataclasses are serialized directly by orjson
+        return ORJSONResponse(resources)
 
     except Exception as e:
         logger.error(f"Error getting water resources: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve water resources")
 
 
-@router.get("/feeding/all", response_model=List[ResourceResponse])
+@router.get("/feeding/all", response_model=List[ResourceResponse], response_class=ORJSONResponse)
 async def get_feeding_resources(
     include_location: bool = Query(True, description="Include GPS coordinates"),
     db: Session = Depends(get_db)
@@ -450,19 +496,15 @@ async def get_feeding_resources(
         service = ResourceService(db)
         resources = service.get_feeding_resources(include_location)
 
-        # Convert to response model
-        response_data = []
-        for resource in resources:
-            response_data.append(ResourceResponse(**resource))
-
-        return response_data
+        # ResourceDTO dataclasses are serialized directly by orjson
+        return ORJSONResponse(resources)
 
     except Exception as e:
         logger.error(f"Error getting feeding resources: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve feeding resources")
 
 
-@router.get("/shelter/all", response_model=List[ResourceResponse])
+@router.get("/shelter/all", response_model=List[ResourceResponse], response_class=ORJSONResponse)
 async def get_shelter_resources(
     include_location: bool = Query(True, description="Include GPS coordinates"),
     db: Session = Depends(get_db)
@@ -481,12 +523,8 @@ async def get_shelter_resources(
         service = ResourceService(db)
         resources = service.get_shelter_resources(include_location)
 
-        # Convert to response model
-        response_data = []
-        for resource in resources:
-            response_data.append(ResourceResponse(**resource))
-
-        return response_data
+        # ResourceDTO dataclasses are serialized directly by orjson
+        return ORJSONResponse(resources)
 
     except Exception as e:
         logger.error(f"Error getting shelter resources: {e}")
@@ -497,6 +535,10 @@ async def get_shelter_resources(
 async def analyze_resource_accessibility(
     cattle_positions: List[Dict[str, float]],
     max_distance_meters: float = Query(500, ge=10, le=2000, description="Maximum distance for accessibility"),
+    detail_types: Optional[List[str]] = Query(
+        None, description="Resource types (water, feed, shelter) to list in resource_details; all if omitted"
+    ),
+    counts_only: bool = Query(False, description="Return counts only, without resource_details"),
     db: Session = Depends(get_db)
 ):
     """
@@ -505,6 +547,8 @@ async def analyze_resource_accessibility(
     Args:
         cattle_positions: List of cattle GPS positions [{'lat': x, 'lng': y}, ...]
         max_distance_meters: Maximum distance to consider resource accessible
+        detail_types: Resource types to list in resource_details; all if omitted
+        counts_only: Skip resource_details entirely (overrides detail_types)
         db: Database session
 
     Returns:
@@ -515,12 +559,17 @@ async def analyze_resource_accessibility(
             raise HTTPException(status_code=400, detail="No cattle positions provided")
 
         service = ResourceService(db)
-        analysis = service.analyze_resource_accessibility(cattle_positions, max_distance_meters)
+        analysis = service.analyze_resource_accessibility(
+            cattle_positions, max_distance_meters,
+            detail_types=[] if counts_only else detail_types
+        )
 
         return analysis
 
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error analyzing resource accessibility: {e}")
         raise HTTPException(status_code=500, detail="Failed to analyze resource accessibility")
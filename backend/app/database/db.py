@@ -20,8 +20,10 @@ ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 engine = create_engine(
     DATABASE_URL,
     echo=ENVIRONMENT == "development",  # Log SQL queries in development
+    pool_size=10,        # Persistent connections shared by requests and background tasks
+    max_overflow=20,     # Extra connections allowed under burst load
     pool_pre_ping=True,  # Check connection validity
-    pool_recycle=3600,   # Recycle connections every hour
+    pool_recycle=1800,   # Recycle connections every 30 minutes
 )
 
 # Session factory
@@ -44,6 +44,7 @@ CREATE TABLE resources (
     resource_type resource_type_enum NOT NULL,
     name VARCHAR(200) NOT NULL,
     location GEOMETRY(POINT, 4326) NOT NULL,
+    geog GEOGRAPHY(POINT, 4326) GENERATED ALWAYS AS (location::geography) STORED,
     description TEXT,
     capacity INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -70,6 +71,8 @@ CREATE INDEX idx_cattle_location ON cattle USING GIST (location);
 CREATE INDEX idx_cattle_history_location ON cattle_history USING GIST (location);
 CREATE INDEX idx_cattle_history_timestamp ON cattle_history (timestamp);
 CREATE INDEX idx_resources_location ON resources USING GIST (location);
+CREATE INDEX idx_resources_geog ON resources USING GIST (geog);
+CREATE UNIQUE INDEX idx_resources_name_type ON resources (name, resource_type);
 CREATE INDEX idx_geofences_boundary ON geofences USING GIST (boundary);
 
 -- Create composite indexes for common queries
@@ -154,6 +157,22 @@ SELECT
     r.created_at
 FROM resources r;
 
+-- Per-type resource aggregates for dashboard summaries, refreshed after resource writes.
+-- Required by the API; the statements are idempotent, so re-run them to upgrade an existing database.
+CREATE MATERIALIZED VIEW IF NOT EXISTS resource_stats_mv AS
+SELECT
+    r.resource_type,
+    COUNT(*) AS resource_count,
+    COALESCE(SUM(r.capacity), 0) AS total_capacity,
+    (ARRAY_AGG(r.id ORDER BY r.created_at DESC NULLS LAST))[1] AS latest_id,
+    (ARRAY_AGG(r.name ORDER BY r.created_at DESC NULLS LAST))[1] AS latest_name,
+    MAX(r.created_at) AS latest_created_at
+FROM resources r
+GROUP BY r.resource_type;
+
+-- Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_resource_stats_mv_type ON resource_stats_mv (resource_type);
+
 -- Create view for geofences with coordinates
 CREATE VIEW geofences_geojson AS
 SELECT
@@ -168,6 +187,13 @@ WHERE g.is_active = TRUE;
 
 -- Useful spatial queries for reference:
 
+-- Upgrade an existing database with the resources geography column:
+-- ALTER TABLE resources ADD COLUMN geog GEOGRAPHY(POINT, 4326) GENERATED ALWAYS AS (location::geography) STORED;
+-- CREATE INDEX idx_resources_geog ON resources USING GIST (geog);
+
+-- Enforce unique resource names per type on an existing database:
+-- CREATE UNIQUE INDEX idx_resources_name_type ON resources (name, resource_type);
+
 -- Query to find cattle outside geofence:
 -- SELECT c.identifier, c.location FROM cattle c, geofences g
 -- WHERE NOT ST_Within(c.location, g.boundary) AND g.name = 'Sumbawa Digital Ranch Main Area';
@@ -12,7 +12,7 @@ from dotenv import load_dotenv
 
 # Import database and services
 from app.database.db import test_connection, get_db, engine, Base
-from app.websocket.ws_manager import ConnectionManager
+from app.websocket.ws_manager import manager
 
 # Import API routes
 from app.api.cattle_routes import router as cattle_router
@@ -21,7 +21,9 @@ from app.api.geofence_routes import router as geofence_router
 from app.api.heatmap_routes import router as heatmap_router
 
 # Import background tasks
-from app.tasks.background_tasks import startup_event, shutdown_event, register_task_management_routes
+from app.tasks.background_tasks import (
+    background_manager, startup_event, shutdown_event, register_task_management_routes
+)
 
 # Load environment variables
 load_dotenv()
@@ -35,10 +37,6 @@ if isinstance(CORS_ORIGINS, str):
     except:
         CORS_ORIGINS = ["http://localhost:5173", "http://localhost:3000"]
 
-# Initialize WebSocket manager
-manager = ConnectionManager()
-
-
 # Create FastAPI app
 app = FastAPI(
     title="Sumbawa Digital Ranch API",
@@ -109,12 +107,14 @@ async def websocket_endpoint(websocket: WebSocket):
     Handles cattle position updates, geofence violations, and notifications
     """
     await manager.connect(websocket)
+    # Cattle broadcasts are incremental, so start the client from a full snapshot
+    await background_manager.send_cattle_snapshot(websocket)
     try:
         while True:
             # Receive message from client
             data = await websocket.receive_text()
             # Echo back or process command
-            await manager.broadcast(f"Server echo: {data}")
+            await manager.broadcast(f"Server echo: {data}".encode())
 
     except WebSocketDisconnect:
         await manager.disconnect(websocket)
@@ -145,6 +145,9 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
+        loop="auto",  # uvloop when installed (not on Windows), asyncio otherwise
+        ws="websockets",
+        ws_per_message_deflate=True,  # Compress large cattle/heatmap broadcasts
         reload=os.getenv("ENVIRONMENT") == "development",
         log_level="info"
     )
\ No newline at end of file
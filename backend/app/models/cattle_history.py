@@ -3,9 +3,13 @@ Cattle History model for Sumbawa Digital Ranch MVP
 Tracks historical GPS positions and movement patterns of individual cattle
 """
 import uuid
+import threading
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
+import numpy as np
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -14,6 +18,15 @@ from geoalchemy2 import Geometry
 from app.database.db import Base
 
 
+# Column layout for aggregated heatmap cells (float32 is ample for map rendering)
+HEATMAP_POINT_DTYPE = np.dtype([
+    ('lat', 'f4'),
+    ('lng', 'f4'),
+    ('intensity', 'i4'),
+    ('weight', 'f4')
+])
+
+
 class CattleHistory(Base):
     """
     Cattle History model representing historical GPS tracking data
@@ -302,24 +315,45 @@ class CattleHistory(Base):
         return f"Cattle history at {self.timestamp} - {location_str}"
 
 
+# Short-lived cache for repeated heatmap windows (e.g. dashboards refreshing every 30 s)
+_heatmap_cache = TTLCache(maxsize=256, ttl=30)
+_heatmap_cache_lock = threading.Lock()
+
+
+def _heatmap_cache_key(session, start_time: datetime, end_time: datetime,
+                       grid_size_meters: float = 100,
+                       bbox: Optional[Tuple[float, float, float, float]] = None):
+    """Build a heatmap cache key at minute resolution; the session is not part of the key"""
+    return hashkey(
+        round(start_time.timestamp() / 60),
+        round(end_time.timestamp() / 60),
+        grid_size_meters,
+        bbox
+    )
+
+
 # Helper class for spatial queries related to cattle history
 class CattleHistorySpatialQueries:
     """Helper class for spatial queries on cattle history data"""
 
     @staticmethod
+    @cached(_heatmap_cache, key=_heatmap_cache_key, lock=_heatmap_cache_lock)
     def get_history_heatmap_data(session, start_time: datetime, end_time: datetime,
-                                grid_size_meters: float = 100) -> List[Dict[str, Any]]:
+                                grid_size_meters: float = 100,
+                                bbox: Optional[Tuple[float, float, float, float]] = None) -> np.ndarray:
         """
         Generate heatmap data by aggregating history points into grid cells
+        Results are cached for 30 seconds per (start minute, end minute, grid size, bbox)
 
         Args:
             session: SQLAlchemy session
             start_time: Start time for heatmap data
             end_time: End time for heatmap data
             grid_size_meters: Size of each grid cell in meters
+            bbox: Optional region of interest as (min_lng, min_lat, max_lng, max_lat)
 
         Returns:
-            List of grid cells with intensity values
+            Read-only structured array of grid cells (HEATMAP_POINT_DTYPE) with intensity values
         """
         from sqlalchemy import func, and_
         from geoalchemy2.functions import ST_SnapToGrid, ST_X, ST_Y
@@ -337,19 +371,48 @@ class CattleHistorySpatialQueries:
                 CattleHistory.timestamp >= start_time,
                 CattleHistory.timestamp <= end_time
             )
-        ).group_by(
+        )
+
+        if bbox:
+            # Bounding-box overlap (&&) is answered from the GiST index before aggregation
+            min_lng, min_lat, max_lng, max_lat = bbox
+            heatmap_query = heatmap_query.filter(
+                CattleHistory.location.op('&&')(
+                    func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+                )
+            )
+
+        heatmap_query = heatmap_query.group_by(
             func.ST_SnapToGrid(CattleHistory.location, grid_size_degrees)
         ).all()
 
-        # Convert to dictionary format
+        # Convert to columnar format; weight mirrors intensity for the Leaflet heat plugin
+        points = np.fromiter(
+            ((row.grid_lat, row.grid_lng, row.intensity, row.intensity) for row in heatmap_query),
+            dtype=HEATMAP_POINT_DTYPE,
+            count=len(heatmap_query)
+        )
+        # Cached arrays are shared between callers, so guard against in-place edits
+        points.flags.writeable = False
+        return points
+
+    @staticmethod
+    def heatmap_points_to_dicts(points: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Convert structured heatmap points to JSON-friendly dictionaries
+
+        Args:
+            points: Structured array returned by get_history_heatmap_data
+
+        Returns:
+            List of dictionaries with 'lat', 'lng', 'intensity' and 'weight' keys
+        """
         return [
-            {
-                'lat': float(row.grid_lat),
-                'lng': float(row.grid_lng),
-                'intensity': int(row.intensity),
-                'weight': float(row.intensity)  # For Leaflet heat plugin
-            }
-            for row in heatmap_query
+            {'lat': lat, 'lng': lng, 'intensity': intensity, 'weight': weight}
+            for lat, lng, intensity, weight in zip(
+                points['lat'].tolist(), points['lng'].tolist(),
+                points['intensity'].tolist(), points['weight'].tolist()
+            )
         ]
 
     @staticmethod
@@ -4,12 +4,12 @@ Defines resources like water troughs, feeding stations, and shelters
 """
 import uuid
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
-from sqlalchemy import Column, String, Integer, Text, DateTime
+from sqlalchemy import Column, String, Integer, Text, DateTime, Computed, Index, cast
 from sqlalchemy.orm import validates
 from sqlalchemy.dialects.postgresql import UUID
-from geoalchemy2 import Geometry
+from geoalchemy2 import Geometry, Geography
 from sqlalchemy import Enum as SQLEnum
 
 from app.database.db import Base
@@ -22,6 +22,31 @@ class ResourceTypeEnum:
     SHELTER = "shelter"
 
 
+# Resource types in display order, and as a frozenset for O(1) validation
+RESOURCE_TYPES = (ResourceTypeEnum.WATER_TROUGH, ResourceTypeEnum.FEEDING_STATION,
+                  ResourceTypeEnum.SHELTER)
+VALID_RESOURCE_TYPES = frozenset(RESOURCE_TYPES)
+
+# Display attributes per resource type, shared by the model and row-based serializers
+RESOURCE_TYPE_ICONS = {
+    ResourceTypeEnum.WATER_TROUGH: "💧",
+    ResourceTypeEnum.FEEDING_STATION: "🌾",
+    ResourceTypeEnum.SHELTER: "🏠"
+}
+
+RESOURCE_TYPE_NAMES = {
+    ResourceTypeEnum.WATER_TROUGH: "Water Trough",
+    ResourceTypeEnum.FEEDING_STATION: "Feeding Station",
+    ResourceTypeEnum.SHELTER: "Shelter"
+}
+
+RESOURCE_TYPE_COLORS = {
+    ResourceTypeEnum.WATER_TROUGH: "#2196F3",  # Blue
+    ResourceTypeEnum.FEEDING_STATION: "#FF9800",  # Orange
+    ResourceTypeEnum.SHELTER: "#607D8B"  # Gray
+}
+
+
 class Resource(Base):
     """
     Resource model representing facilities and infrastructure for cattle
@@ -50,6 +75,13 @@ class Resource(Base):
         comment="Resource GPS location (WGS84 coordinate system)"
     )
 
+    # Geography copy of location maintained by PostgreSQL, GiST-indexed for metre-based ST_DWithin
+    geog = Column(
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False),
+        Computed("location::geography", persisted=True),
+        comment="Resource location as geography for metre-based distance queries"
+    )
+
     # Additional details
     description = Column(Text, nullable=True,
                          comment="Detailed description of the resource")
@@ -62,6 +94,11 @@ class Resource(Base):
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow,
                        comment="Last update timestamp")
 
+    # Resource names are unique within a type; backs the duplicate check in create_resource
+    __table_args__ = (
+        Index('idx_resources_name_type', 'name', 'resource_type', unique=True),
+    )
+
     def __init__(self, resource_type: str, name: str, latitude: float, longitude: float,
                  description: Optional[str] = None, capacity: Optional[int] = None):
         """
@@ -84,10 +121,8 @@ class Resource(Base):
     @validates('resource_type')
     def validate_resource_type(self, key, resource_type):
         """Validate resource type"""
-        valid_types = [ResourceTypeEnum.WATER_TROUGH, ResourceTypeEnum.FEEDING_STATION,
-                       ResourceTypeEnum.SHELTER]
-        if resource_type not in valid_types:
-            raise ValueError(f"Invalid resource type. Must be one of: {valid_types}")
+        if resource_type not in VALID_RESOURCE_TYPES:
+            raise ValueError(f"Invalid resource type. Must be one of: {list(RESOURCE_TYPES)}")
         return resource_type
 
     @validates('name')
@@ -185,31 +220,16 @@ class Resource(Base):
 
     def get_display_name(self) -> str:
         """Get formatted display name with type prefix"""
-        type_prefix = {
-            ResourceTypeEnum.WATER_TROUGH: "💧",
-            ResourceTypeEnum.FEEDING_STATION: "🌾",
-            ResourceTypeEnum.SHELTER: "🏠"
-        }
-        prefix = type_prefix.get(self.resource_type, "📍")
+        prefix = RESOURCE_TYPE_ICONS.get(self.resource_type, "📍")
         return f"{prefix} {self.name}"
 
     def get_type_display_name(self) -> str:
         """Get human-readable type name"""
-        type_names = {
-            ResourceTypeEnum.WATER_TROUGH: "Water Trough",
-            ResourceTypeEnum.FEEDING_STATION: "Feeding Station",
-            ResourceTypeEnum.SHELTER: "Shelter"
-        }
-        return type_names.get(self.resource_type, "Unknown")
+        return RESOURCE_TYPE_NAMES.get(self.resource_type, "Unknown")
 
     def get_color_code(self) -> str:
         """Get color code for mapping visualization"""
-        color_map = {
-            ResourceTypeEnum.WATER_TROUGH: "#2196F3",  # Blue
-            ResourceTypeEnum.FEEDING_STATION: "#FF9800",  # Orange
-            ResourceTypeEnum.SHELTER: "#607D8B"  # Gray
-        }
-        return color_map.get(self.resource_type, "#757575")
+        return RESOURCE_TYPE_COLORS.get(self.resource_type, "#757575")
 
     def to_dict(self, include_location: bool = True, include_distance: bool = False,
                 reference_point: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
@@ -314,6 +334,12 @@ class Resource(Base):
         return f"{self.get_type_display_name()}: {self.name}"
 
 
+def _geography_point(latitude: float, longitude: float):
+    """Build a WGS84 geography point expression for comparisons against Resource.geog"""
+    from sqlalchemy import func
+    return cast(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326), Geography(srid=4326))
+
+
 # Helper class for resource spatial queries
 class ResourceSpatialQueries:
     """Helper class for spatial queries related to resources"""
@@ -335,18 +361,11 @@ class ResourceSpatialQueries:
         Returns:
             List of resource objects within radius
         """
-        from sqlalchemy import func
-        from geoalchemy2.functions import ST_DWithin, ST_SetSRID, ST_MakePoint
-
-        # Convert meters to degrees (approximate)
-        radius_degrees = radius_meters / 111000
+        from geoalchemy2.functions import ST_DWithin
 
+        # Geography distances are in meters and use the GiST index on geog
         query = session.query(Resource).filter(
-            ST_DWithin(
-                Resource.location,
-                ST_SetSRID(ST_MakePoint(longitude, latitude), 4326),
-                radius_degrees
-            )
+            ST_DWithin(Resource.geog, _geography_point(latitude, longitude), radius_meters)
         )
 
         if resource_type:
@@ -354,6 +373,78 @@ class ResourceSpatialQueries:
 
         return query.all()
 
+    @staticmethod
+    def get_resources_near_points(session, points: List[Tuple[float, float]],
+                                  radius_meters: float = 500,
+                                  resource_type: Optional[str] = None) -> List[List[Resource]]:
+        """
+        Get resources within specified radius of each of several points in one query
+
+        Args:
+            session: SQLAlchemy session
+            points: Reference points as (latitude, longitude) tuples
+            radius_meters: Search radius in meters
+            resource_type: Optional filter by resource type
+
+        Returns:
+            One list of resource objects per input point, in input order
+        """
+        from sqlalchemy import values, column, Float
+        from geoalchemy2.functions import ST_DWithin
+
+        if not points:
+            return []
+
+        # Inline VALUES table of (idx, lat, lng) joined against resources
+        query_points = values(
+            column('idx', Integer), column('lat', Float), column('lng', Float),
+            name='query_points'
+        ).data([(idx, lat, lng) for idx, (lat, lng) in enumerate(points)])
+
+        query = session.query(query_points.c.idx, Resource).join(
+            Resource,
+            ST_DWithin(Resource.geog,
+                       _geography_point(query_points.c.lat, query_points.c.lng),
+                       radius_meters)
+        )
+
+        if resource_type:
+            query = query.filter(Resource.resource_type == resource_type)
+
+        results = [[] for _ in points]
+        for idx, resource in query.all():
+            results[idx].append(resource)
+        return results
+
+    @staticmethod
+    def exists_near(session, latitude: float, longitude: float,
+                    radius_meters: float = 500,
+                    resource_type: Optional[str] = None) -> bool:
+        """
+        Check whether any resource lies within specified radius from a point
+
+        Args:
+            session: SQLAlchemy session
+            latitude: Reference point latitude
+            longitude: Reference point longitude
+            radius_meters: Search radius in meters
+            resource_type: Optional filter by resource type
+
+        Returns:
+            True if at least one resource is within radius
+        """
+        from geoalchemy2.functions import ST_DWithin
+
+        # SELECT 1 ... LIMIT 1 stops at the first match and loads no rows
+        query = session.query(Resource.id).filter(
+            ST_DWithin(Resource.geog, _geography_point(latitude, longitude), radius_meters)
+        )
+
+        if resource_type:
+            query = query.filter(Resource.resource_type == resource_type)
+
+        return query.limit(1).scalar() is not None
+
     @staticmethod
     def get_nearest_resource(session, latitude: float, longitude: float,
                             resource_type: Optional[str] = None,
@@ -371,30 +462,18 @@ class ResourceSpatialQueries:
         Returns:
             Nearest resource object or None if not found
         """
-        from sqlalchemy import func
-        from geoalchemy2.functions import ST_Distance, ST_SetSRID, ST_MakePoint
-
-        # Convert meters to degrees (approximate)
-        max_degrees = max_distance_meters / 111000
+        from geoalchemy2.functions import ST_DWithin, ST_Distance
 
+        reference_point = _geography_point(latitude, longitude)
         query = session.query(Resource).filter(
-            ST_DWithin(
-                Resource.location,
-                ST_SetSRID(ST_MakePoint(longitude, latitude), 4326),
-                max_degrees
-            )
+            ST_DWithin(Resource.geog, reference_point, max_distance_meters)
         )
 
         if resource_type:
             query = query.filter(Resource.resource_type == resource_type)
 
         # Order by distance and get the nearest
-        query = query.order_by(
-            ST_Distance(
-                Resource.location,
-                ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
-            )
-        )
+        query = query.order_by(ST_Distance(Resource.geog, reference_point))
 
         return query.first()
 
@@ -422,17 +501,8 @@ class ResourceSpatialQueries:
         ).all()
 
         # Count by type
-        type_counts = {
-            ResourceTypeEnum.WATER_TROUGH: 0,
-            ResourceTypeEnum.FEEDING_STATION: 0,
-            ResourceTypeEnum.SHELTER: 0
-        }
-
-        total_capacity = {
-            ResourceTypeEnum.WATER_TROUGH: 0,
-            ResourceTypeEnum.FEEDING_STATION: 0,
-            ResourceTypeEnum.SHELTER: 0
-        }
+        type_counts = dict.fromkeys(RESOURCE_TYPES, 0)
+        total_capacity = dict.fromkeys(RESOURCE_TYPES, 0)
 
         for resource in resources_in_area:
             type_counts[resource.resource_type] += 1
@@ -8,11 +8,12 @@ import math
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 
 from app.models.cattle import Cattle, CattleSpatialQueries
-from app.models.cattle_history import CattleHistory
+from app.models.cattle_history import CattleHistory, CattleHistorySpatialQueries
 from app.models.geofence import Geofence
 
 
@@ -449,15 +450,15 @@ class CattleSimulationService:
             })
 
         # Get most active areas
-        most_active_areas = sorted(heatmap_data, key=lambda x: x['intensity'], reverse=True)[:10]
+        most_active_areas = heatmap_data[np.argsort(-heatmap_data['intensity'], kind='stable')[:10]]
 
         return {
             'analysis_period_hours': hours,
             'total_activity_points': total_points,
             'average_points_per_hour': total_points / hours if hours > 0 else 0,
             'hourly_activity': list(reversed(hourly_activity)),
-            'heatmap_data': heatmap_data,
-            'most_active_areas': most_active_areas,
+            'heatmap_data': CattleHistorySpatialQueries.heatmap_points_to_dicts(heatmap_data),
+            'most_active_areas': CattleHistorySpatialQueries.heatmap_points_to_dicts(most_active_areas),
             'grid_size_meters': grid_size_meters,
             'analysis_timestamp': datetime.utcnow().isoformat()
         }
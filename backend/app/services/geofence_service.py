@@ -5,16 +5,27 @@ Handles geofence violation detection and spatial boundary management
 import uuid
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, NamedTuple
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from geoalchemy2.functions import ST_Within, ST_Distance, ST_Intersects
+from sqlalchemy import func, and_, or_, select
+from geoalchemy2.functions import ST_Within, ST_Distance, ST_Intersects, ST_X, ST_Y
+from geoalchemy2.shape import to_shape
+from shapely.geometry import Point
+from shapely.geometry.base import BaseGeometry
+from shapely.prepared import PreparedGeometry, prep
 
 from app.models.cattle import Cattle, CattleSpatialQueries
 from app.models.geofence import Geofence, GeofenceSpatialQueries
 
 
+class PreparedGeofence(NamedTuple):
+    """Active geofence boundary prepared for repeated point-in-polygon tests"""
+    name: str
+    boundary: BaseGeometry
+    prepared: PreparedGeometry
+
+
 class GeofenceService:
     """
     Service for geofence management and violation detection
@@ -121,21 +132,75 @@ class GeofenceService:
 
         return violations
 
-    def detect_all_violations(self) -> List[Dict[str, Any]]:
+    def build_prepared_geofences(self) -> Dict[uuid.UUID, PreparedGeofence]:
+        """
+        Load all active geofence boundaries as prepared shapely geometries
+
+        Returns:
+            Dictionary of geofence ID to prepared geofence
+        """
+        active_geofences = self.db.query(Geofence).filter(Geofence.is_active == True).all()
+
+        prepared_geofences = {}
+        for geofence in active_geofences:
+            boundary = to_shape(geofence.boundary)
+            prepared_geofences[geofence.id] = PreparedGeofence(geofence.name, boundary, prep(boundary))
+
+        return prepared_geofences
+
+    def detect_all_violations(self, prepared_geofences: Optional[Dict[uuid.UUID, PreparedGeofence]] = None
+                              ) -> List[Dict[str, Any]]:
         """
         Detect violations across all active geofences
 
+        Cattle positions are read in one query and tested in memory against the
+        prepared boundaries, instead of two PostGIS queries per cattle per geofence.
+
+        Args:
+            prepared_geofences: Optional output of build_prepared_geofences(), built here if omitted
+
         Returns:
             List of all violation alerts
         """
+        if prepared_geofences is None:
+            prepared_geofences = self.build_prepared_geofences()
+        if not prepared_geofences:
+            return []
+
+        cattle_rows = self.db.execute(
+            select(Cattle.id, Cattle.identifier, Cattle.age, Cattle.health_status, Cattle.last_update,
+                   ST_Y(Cattle.location).label('lat'), ST_X(Cattle.location).label('lng'))
+            .where(Cattle.location.isnot(None))
+        ).all()
+        cattle_points = [Point(row.lng, row.lat) for row in cattle_rows]
+
         all_violations = []
 
-        # Get all active geofences
-        active_geofences = self.db.query(Geofence).filter(Geofence.is_active == True).all()
+        for geofence_id, geofence in prepared_geofences.items():
+            for row, point in zip(cattle_rows, cattle_points):
+                if geofence.prepared.contains(point):
+                    continue
 
-        for geofence in active_geofences:
-            geofence_violations = self.detect_violations(geofence.id)
-            all_violations.extend(geofence_violations)
+                # Planar distance in degrees, converted as in detect_violations()
+                distance_meters = float(geofence.boundary.distance(point) * 111000)
+
+                all_violations.append({
+                    'cattle_id': str(row.id),
+                    'identifier': row.identifier,
+                    'age': row.age,
+                    'health_status': row.health_status,
+                    'current_location': {
+                        'lat': row.lat,
+                        'lng': row.lng
+                    },
+                    'violation_type': 'LEFT_GEOFENCE',
+                    'violation_distance_meters': distance_meters,
+                    'geofence_id': str(geofence_id),
+                    'geofence_name': geofence.name,
+                    'detection_timestamp': datetime.utcnow().isoformat(),
+                    'last_update': row.last_update.isoformat() if row.last_update else None,
+                    'severity': self._calculate_violation_severity(distance_meters, row.health_status)
+                })
 
         return all_violations
 
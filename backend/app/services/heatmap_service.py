@@ -4,13 +4,16 @@ Analyzes cattle movement patterns and generates heatmap data
 """
 import uuid
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, extract
 from geoalchemy2.functions import ST_SnapToGrid, ST_X, ST_Y, ST_AsGeoJSON
 
+from app.database.db import SessionLocal
 from app.models.cattle_history import CattleHistory, CattleHistorySpatialQueries
 
 
@@ -44,20 +47,22 @@ class HeatmapService:
         Returns:
             Dictionary with heatmap data and analysis
         """
-        start_time = datetime.utcnow() - timedelta(hours=hours_back)
+        now = datetime.utcnow()
+        now_iso = now.isoformat()
+        start_time = now - timedelta(hours=hours_back)
 
         # Get basic heatmap data
         heatmap_points = CattleHistorySpatialQueries.get_history_heatmap_data(
-            self.db, start_time, datetime.utcnow(), grid_size_meters
+            self.db, start_time, now, grid_size_meters
         )
 
         # Calculate intensity statistics
-        if heatmap_points:
-            intensities = [point['intensity'] for point in heatmap_points]
+        if len(heatmap_points):
+            intensities = heatmap_points['intensity']
             intensity_stats = {
-                'min': min(intensities),
-                'max': max(intensities),
-                'avg': sum(intensities) / len(intensities),
+                'min': int(intensities.min()),
+                'max': int(intensities.max()),
+                'avg': float(intensities.mean()),
                 'total': len(intensities)
             }
         else:
@@ -76,10 +81,10 @@ class HeatmapService:
                 'grid_size_meters': grid_size_meters,
                 'time_buckets': time_buckets,
                 'start_time': start_time.isoformat(),
-                'end_time': datetime.utcnow().isoformat(),
-                'analysis_timestamp': datetime.utcnow().isoformat()
+                'end_time': now_iso,
+                'analysis_timestamp': now_iso
             },
-            'heatmap_points': heatmap_points,
+            'heatmap_points': CattleHistorySpatialQueries.heatmap_points_to_dicts(heatmap_points),
             'intensity_statistics': intensity_stats,
             'temporal_analysis': temporal_analysis,
             'total_points_analyzed': intensity_stats['total']
@@ -112,11 +117,11 @@ class HeatmapService:
             )
 
             # Calculate bucket statistics
-            if bucket_points:
-                intensities = [point['intensity'] for point in bucket_points]
-                total_intensity = sum(intensities)
-                max_intensity = max(intensities)
-                avg_intensity = total_intensity / len(intensities)
+            if len(bucket_points):
+                intensities = bucket_points['intensity']
+                total_intensity = int(intensities.sum())
+                max_intensity = int(intensities.max())
+                avg_intensity = float(intensities.mean())
             else:
                 total_intensity = max_intensity = avg_intensity = 0
 
@@ -125,7 +130,7 @@ class HeatmapService:
                 'start_time': bucket_start.isoformat(),
                 'end_time': bucket_end.isoformat(),
                 'duration_minutes': int(bucket_duration.total_seconds() / 60),
-                'heatmap_points': bucket_points,
+                'heatmap_points': CattleHistorySpatialQueries.heatmap_points_to_dicts(bucket_points),
                 'statistics': {
                     'total_intensity': total_intensity,
                     'max_intensity': max_intensity,
@@ -150,14 +155,35 @@ class HeatmapService:
         Returns:
             Dictionary with activity zone analysis
         """
-        start_time = datetime.utcnow() - timedelta(hours=hours_back)
-
-        # Get raw history points
-        history_points = self.db.query(CattleHistory).filter(
+        now = datetime.utcnow()
+        start_time = now - timedelta(hours=hours_back)
+
+        # Radius clustering runs inside PostGIS (DBSCAN over the GiST-indexed points),
+        # so zones are not split by arbitrary grid cell boundaries
+        cluster_radius_degrees = cluster_radius_meters / 111000  # Convert to degrees
+
+        # Project coordinates server-side and stream rows straight into columns
+        rows = self.db.query(
+            ST_Y(CattleHistory.location).label('lat'),
+            ST_X(CattleHistory.location).label('lng'),
+            CattleHistory.timestamp,
+            CattleHistory.cattle_id,
+            func.ST_ClusterDBSCAN(
+                CattleHistory.location, cluster_radius_degrees, min_activity_threshold
+            ).over().label('cluster_id')
+        ).filter(
             CattleHistory.timestamp >= start_time
-        ).all()
+        ).yield_per(10000)
 
-        if not history_points:
+        lat_column, lng_column, timestamp_column, cattle_column, cluster_column = [], [], [], [], []
+        for row in rows:
+            lat_column.append(row.lat)
+            lng_column.append(row.lng)
+            timestamp_column.append(row.timestamp)
+            cattle_column.append(row.cattle_id)
+            cluster_column.append(-1 if row.cluster_id is None else row.cluster_id)
+
+        if not lat_column:
             return {
                 'metadata': {
                     'analysis_period_hours': hours_back,
@@ -169,64 +195,57 @@ class HeatmapService:
                 'recommendations': []
             }
 
-        # Convert to coordinate format for analysis
-        coordinates = []
-        for point in history_points:
-            coords = point.get_coordinates()
-            if coords:
-                coordinates.append({
-                    'lat': coords['lat'],
-                    'lng': coords['lng'],
-                    'timestamp': point.timestamp,
-                    'cattle_id': str(point.cattle_id)
-                })
-
-        # Perform simple clustering (grid-based approach)
-        grid_size_degrees = cluster_radius_meters / 111000  # Convert to degrees
-
-        # Create activity grid
-        activity_grid = {}
-        for coord in coordinates:
-            grid_x = int(coord['lng'] / grid_size_degrees)
-            grid_y = int(coord['lat'] / grid_size_degrees)
-            grid_key = f"{grid_x},{grid_y}"
-
-            if grid_key not in activity_grid:
-                activity_grid[grid_key] = []
+        lats = np.asarray(lat_column, dtype=np.float64)
+        lngs = np.asarray(lng_column, dtype=np.float64)
+        timestamps = np.asarray(timestamp_column, dtype=object)
+        cattle_ids = np.asarray(cattle_column, dtype=object)
+        cluster_ids = np.asarray(cluster_column, dtype=np.int64)
 
-            activity_grid[grid_key].append(coord)
+        # Group point indices per cluster, dropping DBSCAN noise points (-1)
+        clustered = np.flatnonzero(cluster_ids >= 0)
+        clusters, cluster_index, cluster_counts = np.unique(
+            cluster_ids[clustered], return_inverse=True, return_counts=True
+        )
+        order = clustered[np.argsort(cluster_index, kind='stable')]
+        cluster_members = np.split(order, np.cumsum(cluster_counts)[:-1]) if len(clusters) else []
 
         # Identify activity zones
         activity_zones = []
-        for grid_key, points in activity_grid.items():
-            if len(points) >= min_activity_threshold:
+        for members in cluster_members:
+            if len(members) >= min_activity_threshold:
                 # Calculate zone statistics
-                lats = [p['lat'] for p in points]
-                lngs = [p['lng'] for p in points]
-                timestamps = [p['timestamp'] for p in points]
-                cattle_ids = list(set(p['cattle_id'] for p in points))
+                zone_timestamps = timestamps[members]
+                unique_cattle_count = len(set(cattle_ids[members]))
 
                 # Calculate center point
-                center_lat = sum(lats) / len(lats)
-                center_lng = sum(lngs) / len(lngs)
+                center_lat = float(lats[members].mean())
+                center_lng = float(lngs[members].mean())
 
                 # Calculate time span
-                time_span = max(timestamps) - min(timestamps)
+                first_activity = zone_timestamps.min()
+                last_activity = zone_timestamps.max()
+                time_span = last_activity - first_activity
 
                 activity_zones.append({
                     'zone_id': str(uuid.uuid4()),
                     'center': {'lat': center_lat, 'lng': center_lng},
-                    'activity_count': len(points),
-                    'unique_cattle': len(cattle_ids),
+                    'activity_count': len(members),
+                    'unique_cattle': unique_cattle_count,
                     'time_span_hours': time_span.total_seconds() / 3600,
-                    'first_activity': min(timestamps).isoformat(),
-                    'last_activity': max(timestamps).isoformat(),
-                    'activity_density': len(points) / (time_span.total_seconds() / 3600) if time_span.total_seconds() > 0 else 0,
+                    'first_activity': first_activity.isoformat(),
+                    'last_activity': last_activity.isoformat(),
+                    'activity_density': len(members) / (time_span.total_seconds() / 3600) if time_span.total_seconds() > 0 else 0,
                     'grid_size_meters': cluster_radius_meters
                 })
 
-        # Sort zones by activity count
-        activity_zones.sort(key=lambda z: z['activity_count'], reverse=True)
+        # Sort zones by activity count (NumPy argsort beats TimSort on large zone lists)
+        if len(activity_zones) > 1000:
+            counts = np.fromiter((z['activity_count'] for z in activity_zones),
+                                 dtype=np.int32, count=len(activity_zones))
+            order = np.argsort(-counts, kind='stable')
+            activity_zones = [activity_zones[i] for i in order]
+        else:
+            activity_zones.sort(key=lambda z: z['activity_count'], reverse=True)
 
         # Generate recommendations
         recommendations = self._generate_activity_zone_recommendations(activity_zones, hours_back)
@@ -236,13 +255,13 @@ class HeatmapService:
                 'analysis_period_hours': hours_back,
                 'min_activity_threshold': min_activity_threshold,
                 'cluster_radius_meters': cluster_radius_meters,
-                'total_points': len(coordinates),
+                'total_points': len(lats),
                 'zones_found': len(activity_zones)
             },
             'activity_zones': activity_zones,
             'top_zones': activity_zones[:5],  # Top 5 zones
             'recommendations': recommendations,
-            'analysis_timestamp': datetime.utcnow().isoformat()
+            'analysis_timestamp': now.isoformat()
         }
 
     def _generate_activity_zone_recommendations(self, activity_zones: List[Dict[str, Any]],
@@ -293,8 +312,10 @@ class HeatmapService:
 
         # Resource placement suggestions
         if activity_zones:
-            avg_lat = sum(zone['center']['lat'] for zone in activity_zones) / len(activity_zones)
-            avg_lng = sum(zone['center']['lng'] for zone in activity_zones) / len(activity_zones)
+            avg_lat, avg_lng = np.mean(
+                np.array([[zone['center']['lat'], zone['center']['lng']] for zone in activity_zones]),
+                axis=0
+            )
             recommendations.append(
                 f"Consider central resource placement around ({avg_lat:.4f}, {avg_lng:.4f}) "
                 "to serve multiple activity zones."
@@ -314,7 +335,8 @@ class HeatmapService:
         Returns:
             Dictionary with movement pattern analysis
         """
-        start_time = datetime.utcnow() - timedelta(hours=hours_back)
+        now = datetime.utcnow()
+        start_time = now - timedelta(hours=hours_back)
 
         # Get history data with optional cattle filter
         query = self.db.query(CattleHistory).filter(CattleHistory.timestamp >= start_time)
@@ -354,8 +376,8 @@ class HeatmapService:
                 daily_patterns[day_of_week] = 0
             daily_patterns[day_of_week] += 1
 
-            # Individual cattle data
-            cattle_id = str(point.cattle_id)
+            # Individual cattle data (keyed by raw UUID, stringified for the response)
+            cattle_id = point.cattle_id
             if cattle_id not in cattle_data:
                 cattle_data[cattle_id] = {
                     'point_count': 0,
@@ -382,7 +404,10 @@ class HeatmapService:
             'cattle_participation': {
                 'total_cattle': len(cattle_data),
                 'avg_points_per_cattle': sum(data['point_count'] for data in cattle_data.values()) / len(cattle_data) if cattle_data else 0,
-                'most_active_cattle': sorted(cattle_data.items(), key=lambda x: x[1]['point_count'], reverse=True)[:5]
+                'most_active_cattle': [
+                    (str(cattle_id), data)
+                    for cattle_id, data in sorted(cattle_data.items(), key=lambda x: x[1]['point_count'], reverse=True)[:5]
+                ]
             },
             'movement_statistics': movement_stats
         }
@@ -399,7 +424,7 @@ class HeatmapService:
             },
             'patterns': patterns,
             'recommendations': recommendations,
-            'analysis_timestamp': datetime.utcnow().isoformat()
+            'analysis_timestamp': now.isoformat()
         }
 
     def _calculate_movement_statistics(self, history_points: List[CattleHistory]) -> Dict[str, Any]:
@@ -415,7 +440,7 @@ class HeatmapService:
         # Group by cattle for individual analysis
         cattle_groups = {}
         for point in history_points:
-            cattle_id = str(point.cattle_id)
+            cattle_id = point.cattle_id
             if cattle_id not in cattle_groups:
                 cattle_groups[cattle_id] = []
             cattle_groups[cattle_id].append(point)
@@ -509,14 +534,15 @@ class HeatmapService:
         Returns:
             GeoJSON FeatureCollection with heatmap data
         """
-        start_time = datetime.utcnow() - timedelta(hours=hours_back)
+        now = datetime.utcnow()
+        start_time = now - timedelta(hours=hours_back)
 
         # Get heatmap data
         heatmap_points = CattleHistorySpatialQueries.get_history_heatmap_data(
-            self.db, start_time, datetime.utcnow(), grid_size_meters
+            self.db, start_time, now, grid_size_meters
         )
 
-        if not heatmap_points:
+        if not len(heatmap_points):
             return {
                 'type': 'FeatureCollection',
                 'features': [],
@@ -528,50 +554,52 @@ class HeatmapService:
                 }
             }
 
-        # Calculate intensity range for scaling
-        intensities = [point['intensity'] for point in heatmap_points]
-        min_intensity = min(intensities)
-        max_intensity = max(intensities)
+        # Point attributes are already columns
+        lats = heatmap_points['lat'].tolist()
+        lngs = heatmap_points['lng'].tolist()
+        intensities = heatmap_points['intensity'].tolist()
+        weights = heatmap_points['weight'].tolist()
 
-        # Apply intensity scaling
-        def scale_intensity(value):
-            if max_intensity == min_intensity:
-                return 0.5
+        # Calculate intensity range for scaling
+        intensity_array = heatmap_points['intensity'].astype(np.float64)
+        min_intensity = int(intensity_array.min())
+        max_intensity = int(intensity_array.max())
 
-            normalized = (value - min_intensity) / (max_intensity - min_intensity)
+        # Apply intensity scaling to the whole array at once
+        if max_intensity == min_intensity:
+            scaled = np.full(intensity_array.shape, 0.5)
+        else:
+            normalized = (intensity_array - min_intensity) / (max_intensity - min_intensity)
 
             if intensity_scale == 'log':
-                return math.log1p(normalized * 9) / math.log1p(9)
+                scaled = np.log1p(normalized * 9) / np.log1p(9)
             elif intensity_scale == 'sqrt':
-                return math.sqrt(normalized)
+                scaled = np.sqrt(normalized)
             else:  # linear
-                return normalized
-
-        import math
-
-        # Create GeoJSON features
-        features = []
-        for point in heatmap_points:
-            scaled_intensity = scale_intensity(point['intensity'])
+                scaled = normalized
 
-            # Create a small circle around the grid point
-            radius_degrees = grid_size_meters / 222000  # Half grid size in degrees
+        scaled_intensities = scaled.tolist()
 
-            feature = {
+        # Create GeoJSON features in a single pass over the columns;
+        # serialization is left to orjson in the API layer
+        features = [
+            {
                 'type': 'Feature',
                 'properties': {
-                    'intensity': point['intensity'],
+                    'intensity': intensity,
                     'scaled_intensity': scaled_intensity,
-                    'weight': point.get('weight', point['intensity']),
-                    'lat': point['lat'],
-                    'lng': point['lng']
+                    'weight': weight,
+                    'lat': lat,
+                    'lng': lng
                 },
                 'geometry': {
                     'type': 'Point',
-                    'coordinates': [point['lng'], point['lat']]
+                    'coordinates': [lng, lat]
                 }
             }
-            features.append(feature)
+            for lat, lng, intensity, weight, scaled_intensity
+            in zip(lats, lngs, intensities, weights, scaled_intensities)
+        ]
 
         return {
             'type': 'FeatureCollection',
@@ -584,38 +612,68 @@ class HeatmapService:
                 'min_intensity': min_intensity,
                 'max_intensity': max_intensity,
                 'intensity_range': max_intensity - min_intensity,
-                'analysis_timestamp': datetime.utcnow().isoformat()
+                'analysis_timestamp': now.isoformat()
             }
         }
 
+    def _get_heatmap_in_own_session(self, start_time: datetime, end_time: datetime,
+                                    grid_size_meters: float,
+                                    bbox: Optional[Tuple[float, float, float, float]] = None) -> np.ndarray:
+        """
+        Run a heatmap query on a dedicated session so it can execute in a worker thread
+
+        Args:
+            start_time: Start of the period
+            end_time: End of the period
+            grid_size_meters: Size of grid cells in meters
+            bbox: Optional region of interest as (min_lng, min_lat, max_lng, max_lat)
+
+        Returns:
+            Structured array of heatmap grid cells
+        """
+        # SQLAlchemy sessions are not thread-safe, so each worker gets its own
+        session = SessionLocal()
+        try:
+            return CattleHistorySpatialQueries.get_history_heatmap_data(
+                session, start_time, end_time, grid_size_meters, bbox
+            )
+        finally:
+            session.close()
+
     def compare_periods(self, current_hours: int = 24,
-                        previous_hours: int = 24) -> Dict[str, Any]:
+                        previous_hours: int = 24,
+                        bbox: Optional[Tuple[float, float, float, float]] = None) -> Dict[str, Any]:
         """
         Compare activity between two time periods
 
         Args:
             current_hours: Hours for current period (ending now)
             previous_hours: Hours for previous period (ending current_hours ago)
+            bbox: Optional region of interest as (min_lng, min_lat, max_lng, max_lat)
 
         Returns:
             Dictionary with comparative analysis
         """
         now = datetime.utcnow()
+        now_iso = now.isoformat()
         current_start = now - timedelta(hours=current_hours)
         previous_end = current_start
         previous_start = previous_end - timedelta(hours=previous_hours)
 
-        # Get data for both periods
-        current_points = CattleHistorySpatialQueries.get_history_heatmap_data(
-            self.db, current_start, now, 100  # 100m grid
-        )
-        previous_points = CattleHistorySpatialQueries.get_history_heatmap_data(
-            self.db, previous_start, previous_end, 100
-        )
+        # Get data for both periods concurrently (100m grid)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            current_future = executor.submit(
+                self._get_heatmap_in_own_session, current_start, now, 100, bbox
+            )
+            previous_future = executor.submit(
+                self._get_heatmap_in_own_session, previous_start, previous_end, 100, bbox
+            )
+            current_points = current_future.result()
+            previous_points = previous_future.result()
 
         # Calculate statistics
-        current_intensity = sum(point['intensity'] for point in current_points)
-        previous_intensity = sum(point['intensity'] for point in previous_points)
+        current_intensity = int(current_points['intensity'].sum())
+        previous_intensity = int(previous_points['intensity'].sum())
 
         current_activity_zones = len(current_points)
         previous_activity_zones = len(previous_points)
@@ -637,7 +695,7 @@ class HeatmapService:
             'metadata': {
                 'current_period': {
                     'start': current_start.isoformat(),
-                    'end': now.isoformat(),
+                    'end': now_iso,
                     'hours': current_hours
                 },
                 'previous_period': {
@@ -655,12 +713,15 @@ class HeatmapService:
                 'zones_change_percent': zones_change
             },
             'insights': insights,
-            'current_heatmap_data': current_points,
-            'previous_heatmap_data': previous_points,
-            'analysis_timestamp': now.isoformat()
+            'current_heatmap_data': CattleHistorySpatialQueries.heatmap_points_to_dicts(current_points),
+            'previous_heatmap_data': CattleHistorySpatialQueries.heatmap_points_to_dicts(previous_points),
+            'analysis_timestamp': now_iso
         }
 
-    def __del__(self):
-        """Cleanup when service is destroyed"""
-        if hasattr(self, 'db') and self.db:
-            self.db.close()
\ No newline at end of file
+    def __enter__(self):
+        """Allow use as a context manager; the session stays owned by the caller"""
+        return self
+
+    def __exit__(self, *exc):
+        """Session lifecycle is managed by the caller (e.g. the get_db dependency)"""
+        return None
\ No newline at end of file
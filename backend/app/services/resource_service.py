@@ -4,13 +4,187 @@ Manages water troughs, feeding stations, and shelter locations
 """
 import uuid
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
-
+import threading
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, NamedTuple, Tuple, Iterable, Iterator
+
+import numpy as np
+from cachetools import TTLCache
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import and_, or_, select, insert, text, table, column
+from sqlalchemy.exc import IntegrityError
+from geoalchemy2.functions import ST_X, ST_Y
+
+from app.database.db import SessionLocal
+from app.models.resource import (
+    Resource, ResourceTypeEnum, ResourceSpatialQueries,
+    RESOURCE_TYPES, VALID_RESOURCE_TYPES, RESOURCE_TYPE_ICONS, RESOURCE_TYPE_NAMES, RESOURCE_TYPE_COLORS
+)
+
+
+# Response keys used by the accessibility analysis for each resource type
+_ACCESSIBILITY_KEYS = {
+    ResourceTypeEnum.WATER_TROUGH: 'water',
+    ResourceTypeEnum.FEEDING_STATION: 'feed',
+    ResourceTypeEnum.SHELTER: 'shelter'
+}
+
+# Radius of the influence zone drawn around each resource on the utilization heatmap
+_INFLUENCE_RADIUS_M = 300
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_METERS = 6_371_000
+
+
+def _haversine_term(lat1: np.ndarray, lng1: np.ndarray,
+                    lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    """
+    Pairwise haversine term a = sin²(Δlat/2) + cos(lat1)·cos(lat2)·sin²(Δlng/2)
+
+    Distance grows monotonically with a, so radius checks and nearest-point
+    searches can run on it directly and skip the arcsin/sqrt per pair. The
+    (N, M) result is built in place in two buffers rather than one temporary
+    per operation.
+
+    Args:
+        lat1: Latitudes of the first set in degrees, shape (N,)
+        lng1: Longitudes of the first set in degrees, shape (N,)
+        lat2: Latitudes of the second set in degrees, shape (M,)
+        lng2: Longitudes of the second set in degrees, shape (M,)
+
+    Returns:
+        Array of shape (N, M) with the haversine term per pair
+    """
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+
+    term = np.subtract.outer(lat1, lat2)
+    term *= 0.5
+    np.sin(term, out=term)
+    np.square(term, out=term)
+
+    lng_term = np.subtract.outer(lng1, lng2)
+    lng_term *= 0.5
+    np.sin(lng_term, out=lng_term)
+    np.square(lng_term, out=lng_term)
+    lng_term *= np.cos(lat1)[:, None]
+    lng_term *= np.cos(lat2)[None, :]
+
+    term += lng_term
+    return term
+
+
+def _haversine_term_for_distance(distance_meters: float) -> float:
+    """Haversine term corresponding to a great-circle distance in meters"""
+    return np.sin(distance_meters / (2 * EARTH_RADIUS_METERS)) ** 2
+
 
-from app.models.resource import Resource, ResourceTypeEnum, ResourceSpatialQueries
+def _haversine_distance(term: float) -> float:
+    """Great-circle distance in meters for a haversine term"""
+    return float(2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(min(term, 1.0))))
+
+
+# Plain columns selected for list endpoints; no ORM objects are built for these
+_RESOURCE_LIST_COLUMNS = (
+    Resource.id, Resource.resource_type, Resource.name, Resource.description,
+    Resource.capacity, Resource.created_at, Resource.updated_at
+)
+
+
+@dataclass(slots=True)
+class ResourceDTO:
+    """Resource list entry with the same fields as Resource.to_dict, serializable by orjson"""
+    id: str
+    resource_type: str
+    name: str
+    display_name: str
+    type_display_name: str
+    color: str
+    location: Optional[Dict[str, float]]
+    description: Optional[str]
+    capacity: Optional[int]
+    created_at: Optional[str]
+    updated_at: Optional[str]
+
+
+def _resource_row_to_dto(row) -> ResourceDTO:
+    """
+    Convert a selected resource row mapping to a ResourceDTO
+
+    Args:
+        row: Row mapping with the list columns and optional lat/lng
+
+    Returns:
+        ResourceDTO for the row
+    """
+    resource_type = row['resource_type']
+    lat = row.get('lat')
+    return ResourceDTO(
+        id=str(row['id']),
+        resource_type=resource_type,
+        name=row['name'],
+        display_name=f"{RESOURCE_TYPE_ICONS.get(resource_type, '📍')} {row['name']}",
+        type_display_name=RESOURCE_TYPE_NAMES.get(resource_type, "Unknown"),
+        color=RESOURCE_TYPE_COLORS.get(resource_type, "#757575"),
+        location={'lat': lat, 'lng': row['lng']} if lat is not None else None,
+        description=row['description'],
+        capacity=row['capacity'],
+        created_at=row['created_at'].isoformat() if row['created_at'] else None,
+        updated_at=row['updated_at'].isoformat() if row['updated_at'] else None
+    )
+
+
+class ResourceSnapshot(NamedTuple):
+    """Column-oriented copy of the resources table for read-heavy analytics"""
+    ids: np.ndarray
+    names: np.ndarray
+    types: np.ndarray
+    lats: np.ndarray
+    lngs: np.ndarray
+    capacities: np.ndarray
+    records: Tuple[ResourceDTO, ...]
+
+
+# Per-type aggregates maintained as a materialized view (see init_db.sql)
+_resource_stats_mv = table(
+    'resource_stats_mv',
+    column('resource_type'),
+    column('resource_count'),
+    column('total_capacity'),
+    column('latest_id'),
+    column('latest_name'),
+    column('latest_created_at')
+)
+
+# Resources change rarely, so analytics share a 30 s snapshot instead of re-querying
+_resource_snapshot_cache = TTLCache(maxsize=1, ttl=30)
+_resource_snapshot_lock = threading.Lock()
+
+
+def check_resource_stats_view() -> bool:
+    """
+    Check once at startup that resource_stats_mv exists
+
+    Returns:
+        True if the view exists; otherwise logs how to create it and returns False
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        with SessionLocal() as db:
+            exists = bool(db.execute(text("SELECT to_regclass('resource_stats_mv') IS NOT NULL")).scalar())
+    except Exception as e:
+        logger.error(f"Error checking resource_stats_mv: {e}")
+        return False
+    if not exists:
+        logger.error("resource_stats_mv is missing; re-run the resource_stats_mv statements in init_db.sql")
+    return exists
+
+
+def invalidate_resource_snapshot():
+    """Drop the cached resource snapshot after a resource is created, updated or deleted"""
+    with _resource_snapshot_lock:
+        _resource_snapshot_cache.clear()
 
 
 class ResourceService:
@@ -29,26 +203,92 @@ class ResourceService:
         self.db = db_session
         self.logger = logging.getLogger(__name__)
 
+    def _get_resource_snapshot(self) -> ResourceSnapshot:
+        """
+        Get the cached column snapshot of all resources, loading it if expired
+
+        Returns:
+            ResourceSnapshot with one array entry per resource
+        """
+        with _resource_snapshot_lock:
+            snapshot = _resource_snapshot_cache.get('resources')
+        if snapshot is not None:
+            return snapshot
+
+        # Plain column rows with ST_Y/ST_X coordinates; no ORM objects or get_coordinates() calls
+        records = tuple(self._select_resource_dtos(include_location=True))
+
+        snapshot = ResourceSnapshot(
+            ids=np.array([record.id for record in records], dtype=object),
+            names=np.array([record.name for record in records], dtype=object),
+            types=np.array([record.resource_type for record in records], dtype=object),
+            lats=np.array([record.location['lat'] for record in records], dtype=np.float64),
+            lngs=np.array([record.location['lng'] for record in records], dtype=np.float64),
+            capacities=np.array([record.capacity for record in records], dtype=object),
+            records=records
+        )
+
+        with _resource_snapshot_lock:
+            _resource_snapshot_cache['resources'] = snapshot
+        return snapshot
+
+    def _refresh_resource_stats(self):
+        """Refresh resource_stats_mv after a committed write; a stale view is logged, not raised"""
+        try:
+            self.db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY resource_stats_mv"))
+            self.db.commit()
+        except Exception as e:
+            self.logger.error(f"Error refreshing resource stats view: {e}")
+            self.db.rollback()
+
+    def _select_resource_dtos(self, include_location: bool,
+                              resource_type: Optional[str] = None,
+                              yield_per: Optional[int] = None) -> Iterator[ResourceDTO]:
+        """
+        Select resources as row mappings and convert them without ORM hydration
+
+        The statement executes immediately; rows are converted as the result is consumed.
+
+        Args:
+            include_location: Whether to select GPS coordinates
+            resource_type: Optional filter by resource type
+            yield_per: Fetch rows in batches of this size through a server-side cursor
+
+        Returns:
+            Iterator of ResourceDTO objects
+        """
+        columns = list(_RESOURCE_LIST_COLUMNS)
+        if include_location:
+            columns += [ST_Y(Resource.location).label('lat'), ST_X(Resource.location).label('lng')]
+
+        stmt = select(*columns)
+        if resource_type is not None:
+            stmt = stmt.where(Resource.resource_type == resource_type)
+        if yield_per is not None:
+            stmt = stmt.execution_options(yield_per=yield_per)
+
+        rows = self.db.execute(stmt).mappings()
+        return (_resource_row_to_dto(row) for row in rows)
+
     def get_all_resources(self, include_location: bool = True,
-                         include_metrics: bool = False) -> List[Dict[str, Any]]:
+                         include_metrics: bool = False) -> Iterator[ResourceDTO]:
         """
         Get all resources in the system
 
+        Rows are streamed from a server-side cursor, so the iterator must be
+        consumed while the session is open.
+
         Args:
             include_location: Whether to include GPS coordinates
             include_metrics: Whether to include usage metrics
 
         Returns:
-            List of resource dictionaries
+            Iterator of ResourceDTO objects
         """
-        resources = self.db.query(Resource).all()
-        return [resource.to_dict(include_location=include_location,
-                                 include_distance=False,
-                                 reference_point=None)
-                for resource in resources]
+        return self._select_resource_dtos(include_location, yield_per=500)
 
     def get_resources_by_type(self, resource_type: str,
-                             include_location: bool = True) -> List[Dict[str, Any]]:
+                             include_location: bool = True) -> List[ResourceDTO]:
         """
         Get resources filtered by type
 
@@ -57,16 +297,13 @@ class ResourceService:
             include_location: Whether to include GPS coordinates
 
         Returns:
-            List of filtered resource dictionaries
+            List of filtered ResourceDTO objects
         """
         # Validate resource type
-        valid_types = [ResourceTypeEnum.WATER_TROUGH, ResourceTypeEnum.FEEDING_STATION,
-                       ResourceTypeEnum.SHELTER]
-        if resource_type not in valid_types:
-            raise ValueError(f"Invalid resource type. Must be one of: {valid_types}")
+        if resource_type not in VALID_RESOURCE_TYPES:
+            raise ValueError(f"Invalid resource type. Must be one of: {list(RESOURCE_TYPES)}")
 
-        resources = self.db.query(Resource).filter(Resource.resource_type == resource_type).all()
-        return [resource.to_dict(include_location=include_location) for resource in resources]
+        return list(self._select_resource_dtos(include_location, resource_type))
 
     def get_resources_near_point(self, latitude: float, longitude: float,
                                 radius_meters: float = 500,
@@ -92,6 +329,25 @@ class ResourceService:
                                  reference_point=reference_point)
                 for resource in resources]
 
+    def exists_resource_near_point(self, latitude: float, longitude: float,
+                                   radius_meters: float = 500,
+                                   resource_type: Optional[str] = None) -> bool:
+        """
+        Check whether any resource exists within specified radius from a point
+
+        Args:
+            latitude: Reference point latitude
+            longitude: Reference point longitude
+            radius_meters: Search radius in meters
+            resource_type: Optional filter by resource type
+
+        Returns:
+            True if at least one resource is within radius
+        """
+        return ResourceSpatialQueries.exists_near(
+            self.db, latitude, longitude, radius_meters, resource_type
+        )
+
     def get_nearest_resource(self, latitude: float, longitude: float,
                             resource_type: Optional[str] = None,
                             max_distance_meters: float = 1000) -> Optional[Dict[str, Any]]:
@@ -136,19 +392,11 @@ class ResourceService:
             Created resource object
         """
         # Validate resource type
-        valid_types = [ResourceTypeEnum.WATER_TROUGH, ResourceTypeEnum.FEEDING_STATION,
-                       ResourceTypeEnum.SHELTER]
-        if resource_type not in valid_types:
-            raise ValueError(f"Invalid resource type. Must be one of: {valid_types}")
-
-        # Check for duplicate names within same type
-        existing = self.db.query(Resource).filter(
-            and_(Resource.name == name, Resource.resource_type == resource_type)
-        ).first()
-        if existing:
-            raise ValueError(f"Resource with name '{name}' and type '{resource_type}' already exists")
-
-        resource = Resource(
+        if resource_type not in VALID_RESOURCE_TYPES:
+            raise ValueError(f"Invalid resource type. Must be one of: {list(RESOURCE_TYPES)}")
+
+        # Transient instance runs the model validators and builds the location expression
+        new_resource = Resource(
             resource_type=resource_type,
             name=name,
             latitude=latitude,
@@ -157,9 +405,30 @@ class ResourceService:
             capacity=capacity
         )
 
-        self.db.add(resource)
-        self.db.commit()
-        self.db.refresh(resource)
+        # INSERT ... RETURNING yields the stored row, generated columns included, in one round-trip
+        stmt = insert(Resource).values(
+            resource_type=new_resource.resource_type,
+            name=new_resource.name,
+            location=new_resource.location,
+            description=new_resource.description,
+            capacity=new_resource.capacity,
+            updated_at=new_resource.updated_at
+        ).returning(Resource)
+
+        # Duplicate names within same type are rejected by the unique (name, type) index
+        try:
+            resource = self.db.execute(stmt).scalar_one()
+            # Detach so commit does not expire the returned values and force a reload
+            self.db.expunge(resource)
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            constraint = getattr(getattr(e.orig, 'diag', None), 'constraint_name', None)
+            if constraint == 'idx_resources_name_type':
+                raise ValueError(f"Resource with name '{name}' and type '{resource_type}' already exists")
+            raise
+        invalidate_resource_snapshot()
+        self._refresh_resource_stats()
 
         return resource
 
@@ -190,13 +459,15 @@ class ResourceService:
         try:
             # Update basic details
             if name is not None:
-                # Check for duplicate names
-                existing = self.db.query(Resource).filter(
-                    and_(Resource.name == name,
-                         Resource.resource_type == resource.resource_type,
-                         Resource.id != resource_id)
-                ).first()
-                if existing:
+                # Check for duplicate names with SELECT EXISTS, no row is loaded
+                exists = self.db.query(
+                    self.db.query(Resource.id).filter(
+                        and_(Resource.name == name,
+                             Resource.resource_type == resource.resource_type,
+                             Resource.id != resource_id)
+                    ).exists()
+                ).scalar()
+                if exists:
                     raise ValueError(f"Resource with name '{name}' already exists")
                 resource.name = name
 
@@ -211,13 +482,15 @@ class ResourceService:
                 resource.set_location(latitude, longitude)
 
             self.db.commit()
-            return True
-
+            invalidate_resource_snapshot()
         except Exception as e:
             self.logger.error(f"Error updating resource {resource_id}: {e}")
             self.db.rollback()
             return False
 
+        self._refresh_resource_stats()
+        return True
+
     def delete_resource(self, resource_id: uuid.UUID) -> bool:
         """
         Delete a resource
@@ -234,9 +507,11 @@ class ResourceService:
 
         self.db.delete(resource)
         self.db.commit()
+        invalidate_resource_snapshot()
+        self._refresh_resource_stats()
         return True
 
-    def get_water_resources(self, include_location: bool = True) -> List[Dict[str, Any]]:
+    def get_water_resources(self, include_location: bool = True) -> List[ResourceDTO]:
         """
         Get all water resources
 
@@ -244,11 +519,11 @@ class ResourceService:
             include_location: Whether to include GPS coordinates
 
         Returns:
-            List of water resource dictionaries
+            List of water ResourceDTO objects
         """
         return self.get_resources_by_type(ResourceTypeEnum.WATER_TROUGH, include_location)
 
-    def get_feeding_resources(self, include_location: bool = True) -> List[Dict[str, Any]]:
+    def get_feeding_resources(self, include_location: bool = True) -> List[ResourceDTO]:
         """
         Get all feeding station resources
 
@@ -256,11 +531,11 @@ class ResourceService:
             include_location: Whether to include GPS coordinates
 
         Returns:
-            List of feeding station dictionaries
+            List of feeding station ResourceDTO objects
         """
         return self.get_resources_by_type(ResourceTypeEnum.FEEDING_STATION, include_location)
 
-    def get_shelter_resources(self, include_location: bool = True) -> List[Dict[str, Any]]:
+    def get_shelter_resources(self, include_location: bool = True) -> List[ResourceDTO]:
         """
         Get all shelter resources
 
@@ -268,64 +543,72 @@ class ResourceService:
             include_location: Whether to include GPS coordinates
 
         Returns:
-            List of shelter resource dictionaries
+            List of shelter ResourceDTO objects
         """
         return self.get_resources_by_type(ResourceTypeEnum.SHELTER, include_location)
 
     def analyze_resource_accessibility(self, cattle_positions: List[Dict[str, float]],
-                                     max_distance_meters: float = 500) -> Dict[str, Any]:
+                                     max_distance_meters: float = 500,
+                                     detail_types: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         Analyze resource accessibility for cattle positions
 
         Args:
             cattle_positions: List of cattle GPS positions [{'lat': x, 'lng': y}, ...]
             max_distance_meters: Maximum distance to consider resource accessible
+            detail_types: Resource types ('water', 'feed', 'shelter') to list in
+                resource_details; None lists all, an empty iterable returns counts only
 
         Returns:
             Dictionary with accessibility analysis
+
+        Raises:
+            ValueError: If detail_types contains an unknown resource type
         """
         if not cattle_positions:
             return {'error': 'No cattle positions provided'}
 
-        total_cattle = len(cattle_positions)
-        accessible_counts = {
-            'water': 0,
-            'feed': 0,
-            'shelter': 0
-        }
-
-        resource_details = {
-            'water': [],
-            'feed': [],
-            'shelter': []
-        }
-
-        for cattle_pos in cattle_positions:
-            lat, lng = cattle_pos['lat'], cattle_pos['lng']
-
-            # Check water resources
-            water_resources = self.get_resources_near_point(
-                lat, lng, max_distance_meters, ResourceTypeEnum.WATER_TROUGH
-            )
-            if water_resources:
-                accessible_counts['water'] += 1
-                resource_details['water'].extend(water_resources)
-
-            # Check feeding resources
-            feed_resources = self.get_resources_near_point(
-                lat, lng, max_distance_meters, ResourceTypeEnum.FEEDING_STATION
+        if detail_types is None:
+            detail_types = _ACCESSIBILITY_KEYS.values()
+        detail_types = set(detail_types)
+        unknown_types = detail_types.difference(_ACCESSIBILITY_KEYS.values())
+        if unknown_types:
+            raise ValueError(
+                f"Invalid detail types {sorted(unknown_types)}. Must be among: {list(_ACCESSIBILITY_KEYS.values())}"
             )
-            if feed_resources:
-                accessible_counts['feed'] += 1
-                resource_details['feed'].extend(feed_resources)
 
-            # Check shelter resources
-            shelter_resources = self.get_resources_near_point(
-                lat, lng, max_distance_meters, ResourceTypeEnum.SHELTER
-            )
-            if shelter_resources:
-                accessible_counts['shelter'] += 1
-                resource_details['shelter'].extend(shelter_resources)
+        total_cattle = len(cattle_positions)
+        cattle_lats = np.fromiter((pos['lat'] for pos in cattle_positions), dtype=np.float64, count=total_cattle)
+        cattle_lngs = np.fromiter((pos['lng'] for pos in cattle_positions), dtype=np.float64, count=total_cattle)
+
+        # Resources (tens to hundreds per ranch) come from the cached column snapshot
+        snapshot = self._get_resource_snapshot()
+
+        # (cattle x resource) distance matrix, masked by the accessibility radius
+        terms = _haversine_term(cattle_lats, cattle_lngs, snapshot.lats, snapshot.lngs)
+        within = terms <= _haversine_term_for_distance(max_distance_meters)
+
+        accessible_counts = {}
+        available_counts = {}
+        resource_details = {}
+        for resource_type, resource_key in _ACCESSIBILITY_KEYS.items():
+            type_columns = np.flatnonzero(snapshot.types == resource_type)
+            type_within = within[:, type_columns]
+            reachable_columns = type_columns[type_within.any(axis=0)]
+            accessible_counts[resource_key] = int(type_within.any(axis=1).sum())
+            available_counts[resource_key] = len(reachable_columns)
+
+            # Counts are enough unless the caller asked for this type's details
+            if resource_key not in detail_types:
+                continue
+
+            resource_details[resource_key] = []
+            for column in reachable_columns:
+                nearest_distance = _haversine_distance(terms[within[:, column], column].min())
+                resource_data = asdict(snapshot.records[column])
+                resource_data['distance_meters'] = nearest_distance
+                resource_data['distance_text'] = f"{nearest_distance:.0f}m"
+                resource_details[resource_key].append(resource_data)
 
         # Calculate percentages
         accessibility_percentages = {
@@ -333,25 +616,14 @@ class ResourceService:
             for resource_type, count in accessible_counts.items()
         }
 
-        # Remove duplicates from resource details
-        for resource_type in resource_details:
-            seen_ids = set()
-            resource_details[resource_type] = [
-                resource for resource in resource_details[resource_type]
-                if resource['id'] not in seen_ids and not seen_ids.add(resource['id'])
-            ]
-
         return {
             'total_cattle': total_cattle,
             'max_distance_meters': max_distance_meters,
             'cattle_with_access': accessible_counts,
             'accessibility_percentages': accessibility_percentages,
-            'available_resources': {
-                resource_type: len(resources)
-                for resource_type, resources in resource_details.items()
-            },
+            'available_resources': available_counts,
             'resource_details': resource_details,
-            'analysis_timestamp': datetime.utcnow().isoformat()
+            'analysis_timestamp': datetime.now(timezone.utc).isoformat()
         }
 
     def get_resource_utilization_heatmap(self, hours_back: int = 24,
@@ -368,94 +640,88 @@ class ResourceService:
         """
         # Get cattle history data for the specified time period
         from app.models.cattle_history import CattleHistory, CattleHistorySpatialQueries
-        from datetime import timedelta
 
-        start_time = datetime.utcnow() - timedelta(hours=hours_back)
+        # One clock read so the window end and the reported timestamp agree
+        now = datetime.now(timezone.utc)
+        start_time = now - timedelta(hours=hours_back)
 
         # Get heatmap data from cattle history
         heatmap_data = CattleHistorySpatialQueries.get_history_heatmap_data(
-            self.db, start_time, datetime.utcnow(), grid_size_meters
+            self.db, start_time, now, grid_size_meters
         )
 
-        # Get resource locations
-        resources = self.db.query(Resource).all()
-        resource_points = []
-
-        for resource in resources:
-            coords = resource.get_coordinates()
-            if coords:
-                resource_points.append({
-                    'id': str(resource.id),
-                    'name': resource.name,
-                    'type': resource.resource_type,
-                    'lat': coords['lat'],
-                    'lng': coords['lng'],
-                    'capacity': resource.capacity
-                })
+        # Get resource locations from the cached snapshot
+        snapshot = self._get_resource_snapshot()
+        resource_points = [
+            {
+                'id': resource_id,
+                'name': name,
+                'type': resource_type,
+                'lat': lat,
+                'lng': lng,
+                'capacity': capacity
+            }
+            for resource_id, name, resource_type, lat, lng, capacity in zip(
+                snapshot.ids, snapshot.names, snapshot.types,
+                snapshot.lats.tolist(), snapshot.lngs.tolist(), snapshot.capacities
+            )
+        ]
 
         # Calculate resource influence zones
-        influence_zones = []
-        for resource in resource_points:
-            # Create influence zone around each resource
-            zone_size_degrees = 300 / 111000  # 300 meters in degrees
-            influence_zones.append({
+        influence_scores = self._calculate_resource_influence(snapshot.types, snapshot.capacities)
+        influence_zones = [
+            {
                 'resource': {
                     'id': resource['id'],
                     'name': resource['name'],
                     'type': resource['type']
                 },
                 'center': {'lat': resource['lat'], 'lng': resource['lng']},
-                'radius_meters': 300,
-                'influence_score': self._calculate_resource_influence(resource)
-            })
+                'radius_meters': _INFLUENCE_RADIUS_M,
+                'influence_score': influence_score
+            }
+            for resource, influence_score in zip(resource_points, influence_scores.tolist())
+        ]
 
         return {
             'analysis_period_hours': hours_back,
             'grid_size_meters': grid_size_meters,
-            'heatmap_data': heatmap_data,
+            'heatmap_data': CattleHistorySpatialQueries.heatmap_points_to_dicts(heatmap_data),
             'resource_points': resource_points,
             'resource_influence_zones': influence_zones,
             'total_activity_points': len(heatmap_data),
-            'analysis_timestamp': datetime.utcnow().isoformat()
+            'analysis_timestamp': now.isoformat()
         }
 
-    def _calculate_resource_influence(self, resource: Dict[str, Any]) -> float:
+    def _calculate_resource_influence(self, resource_types: np.ndarray,
+                                      capacities: np.ndarray) -> np.ndarray:
         """
-        Calculate influence score for a resource based on type and capacity
+        Calculate influence scores for resources based on type and capacity
 
         Args:
-            resource: Resource dictionary
+            resource_types: Resource type of each resource
+            capacities: Capacity of each resource (None if unknown)
 
         Returns:
-            Influence score (0.0 to 1.0)
+            Array of influence scores (0.0 to 1.0)
         """
-        base_scores = {
-            'water_trough': 0.8,      # Water is most important
-            'feeding_station': 0.7,   # Food is very important
-            'shelter': 0.5            # Shelter is moderately important
-        }
+        # One mask per entry of RESOURCE_TYPES: water, feeding, shelter
+        conditions = [resource_types == resource_type for resource_type in RESOURCE_TYPES]
 
-        base_score = base_scores.get(resource['type'], 0.5)
-
-        # Adjust for capacity if available
-        if resource.get('capacity'):
-            # Normalize capacity (assuming typical ranges)
-            if resource['type'] == 'water_trough':
-                # Water capacity in liters, typical 50-200
-                capacity_score = min(resource['capacity'] / 200, 1.0)
-            elif resource['type'] == 'feeding_station':
-                # Feeding capacity in cattle count, typical 10-50
-                capacity_score = min(resource['capacity'] / 50, 1.0)
-            elif resource['type'] == 'shelter':
-                # Shelter capacity in cattle count, typical 20-40
-                capacity_score = min(resource['capacity'] / 40, 1.0)
-            else:
-                capacity_score = 0.5
+        # Water is most important, food very important, shelter moderately important
+        base_scores = np.select(conditions, [0.8, 0.7, 0.5], default=0.5)
 
-            # Weight capacity as 30% of total score
-            return (base_score * 0.7) + (capacity_score * 0.3)
-        else:
-            return base_score
+        # Normalize capacity against typical ranges: water 50-200 liters,
+        # feeding 10-50 cattle, shelter 20-40 cattle
+        caps = np.array([capacity or 0 for capacity in capacities], dtype=np.float64)
+        capacity_scores = np.select(
+            conditions,
+            [np.minimum(caps / 200, 1.0), np.minimum(caps / 50, 1.0), np.minimum(caps / 40, 1.0)],
+            default=0.5
+        )
+
+        # Weight capacity as 30% of total score when it is known
+        return np.where(caps > 0, base_scores * 0.7 + capacity_scores * 0.3, base_scores)
 
     def get_resource_density_analysis(self, geofence_wkt: str) -> Dict[str, Any]:
         """
@@ -531,7 +797,7 @@ class ResourceService:
             'current_resources': current_counts,
             'additional_resources_needed': additional_needed,
             'recommendations': recommendations,
-            'analysis_timestamp': datetime.utcnow().isoformat()
+            'analysis_timestamp': datetime.now(timezone.utc).isoformat()
         }
 
     def get_resource_summary_stats(self) -> Dict[str, Any]:
@@ -541,30 +807,20 @@ class ResourceService:
         Returns:
             Dictionary with resource statistics
         """
-        total_resources = self.db.query(Resource).count()
-
-        resource_counts = {
-            'water_trough': self.db.query(Resource).filter(
-                Resource.resource_type == ResourceTypeEnum.WATER_TROUGH
-            ).count(),
-            'feeding_station': self.db.query(Resource).filter(
-                Resource.resource_type == ResourceTypeEnum.FEEDING_STATION
-            ).count(),
-            'shelter': self.db.query(Resource).filter(
-                Resource.resource_type == ResourceTypeEnum.SHELTER
-            ).count()
-        }
+        # Aggregates are precomputed by resource_stats_mv, one row per resource type
+        rows = self.db.execute(select(_resource_stats_mv)).all()
 
-        # Calculate total capacity by type
-        capacity_totals = {}
-        for resource_type in resource_counts.keys():
-            total_capacity = self.db.query(func.coalesce(func.sum(Resource.capacity), 0)).filter(
-                Resource.resource_type == resource_type
-            ).scalar()
-            capacity_totals[resource_type] = int(total_capacity) if total_capacity else 0
+        resource_counts = dict.fromkeys(RESOURCE_TYPES, 0)
+        capacity_totals = dict.fromkeys(RESOURCE_TYPES, 0)
+        latest = None
+        for row in rows:
+            resource_counts[row.resource_type] = row.resource_count
+            capacity_totals[row.resource_type] = int(row.total_capacity)
+            if row.latest_created_at is not None and (
+                    latest is None or row.latest_created_at > latest.latest_created_at):
+                latest = row
 
-        # Get most recently created resource
-        latest_resource = self.db.query(Resource).order_by(Resource.created_at.desc()).first()
+        total_resources = sum(resource_counts.values())
 
         return {
             'total_resources': total_resources,
@@ -575,15 +831,156 @@ class ResourceService:
             },
             'total_capacity_by_type': capacity_totals,
             'latest_resource': {
-                'id': str(latest_resource.id),
-                'name': latest_resource.name,
-                'type': latest_resource.resource_type,
-                'created_at': latest_resource.created_at.isoformat()
-            } if latest_resource else None,
-            'analysis_timestamp': datetime.utcnow().isoformat()
+                'id': str(latest.latest_id),
+                'name': latest.latest_name,
+                'type': latest.resource_type,
+                'created_at': latest.latest_created_at.isoformat()
+            } if latest is not None else None,
+            'analysis_timestamp': datetime.now(timezone.utc).isoformat()
+        }
+
+    def __enter__(self):
+        """Allow use as a context manager; the session stays owned by the caller"""
+        return self
+
+    def __exit__(self, *exc):
+        """Session lifecycle is managed by the caller (e.g. the get_db dependency)"""
+        return None
+
+
+class ResourceBatchLoader:
+    """
+    Coalesces concurrent nearby-resource lookups into one spatial query
+
+    Calls queued within a short window are grouped by (radius, resource type)
+    and answered with a single VALUES-join query per group on a dedicated session.
+    """
+
+    def __init__(self, session_factory=SessionLocal, window_seconds: float = 0.005):
+        """
+        Initialize batch loader
+
+        Args:
+            session_factory: Callable returning a new SQLAlchemy session for each flush
+            window_seconds: How long to collect requests before flushing
+        """
+        self.session_factory = session_factory
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[float, Optional[str]], List[Tuple[float, float, Future]]] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    def load(self, latitude: float, longitude: float, radius_meters: float = 500,
+             resource_type: Optional[str] = None) -> Future:
+        """
+        Queue a nearby-resource lookup
+
+        Args:
+            latitude: Reference point latitude
+            longitude: Reference point longitude
+            radius_meters: Search radius in meters
+            resource_type: Optional filter by resource type
+
+        Returns:
+            Future resolving to the same list get_resources_near_point returns
+        """
+        future = Future()
+        with self._lock:
+            self._pending.setdefault((radius_meters, resource_type), []).append(
+                (latitude, longitude, future)
+            )
+            if self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def get_resources_near_point(self, latitude: float, longitude: float,
+                                 radius_meters: float = 500,
+                                 resource_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Blocking form of load() with the ResourceService signature
+
+        Args:
+            latitude: Reference point latitude
+            longitude: Reference point longitude
+            radius_meters: Search radius in meters
+            resource_type: Optional filter by resource type
+
+        Returns:
+            List of nearby resources with distance information
+        """
+        return self.load(latitude, longitude, radius_meters, resource_type).result()
+
+    def _flush(self):
+        """Run one spatial query per pending group and resolve the waiting futures"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+
+        # Drop futures whose callers were cancelled (e.g. client disconnect); the
+        # rest are marked running so they can no longer be cancelled mid-flush
+        pending = {
+            key: [request for request in requests if request[2].set_running_or_notify_cancel()]
+            for key, requests in pending.items()
         }
 
-    def __del__(self):
-        """Cleanup when service is destroyed"""
-        if hasattr(self, 'db') and self.db:
-            self.db.close()
\ No newline at end of file
+        session = None
+        try:
+            session = self.session_factory()
+            for (radius_meters, resource_type), requests in pending.items():
+                if not requests:
+                    continue
+                try:
+                    results = ResourceSpatialQueries.get_resources_near_points(
+                        session, [(lat, lng) for lat, lng, _ in requests],
+                        radius_meters, resource_type
+                    )
+                except Exception as e:
+                    session.rollback()
+                    for _, _, future in requests:
+                        self._resolve(future, exception=e)
+                    continue
+
+                for (lat, lng, future), resources in zip(requests, results):
+                    try:
+                        reference_point = {'lat': lat, 'lng': lng}
+                        self._resolve(future, result=[
+                            resource.to_dict(include_location=True, include_distance=True,
+                                             reference_point=reference_point)
+                            for resource in resources
+                        ])
+                    except Exception as e:
+                        self._resolve(future, exception=e)
+        except Exception as e:
+            # Session creation or an unexpected error: never leave a caller waiting
+            for requests in pending.values():
+                for _, _, future in requests:
+                    self._resolve(future, exception=e)
+        finally:
+            if session is not None:
+                session.close()
+
+    @staticmethod
+    def _resolve(future: Future, result: Any = None, exception: Optional[BaseException] = None):
+        """
+        Complete a future unless it is already done
+
+        Args:
+            future: Future to complete
+            result: Result to set when no exception is given
+            exception: Exception to set instead of a result
+        """
+        if future.done():
+            return
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+
+# Shared loader so lookups from concurrent requests land in the same batch
+resource_batch_loader = ResourceBatchLoader()
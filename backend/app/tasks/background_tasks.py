@@ -3,18 +3,27 @@ Background Tasks for Sumbawa Digital Ranch MVP
 Handles real-time cattle simulation and periodic updates
 """
 import asyncio
+import hashlib
 import logging
+import random
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
+import orjson
+from sqlalchemy import select, inspect
 from sqlalchemy.orm import Session
-from fastapi import FastAPI
+from geoalchemy2.functions import ST_X, ST_Y
+from fastapi import FastAPI, WebSocket
 
 from app.database.db import SessionLocal
+from app.models.cattle import Cattle
+from app.models.geofence import Geofence
 from app.services.cattle_service import CattleSimulationService
 from app.services.geofence_service import GeofenceService
 from app.services.heatmap_service import HeatmapService
+from app.services.resource_service import check_resource_stats_view
 from app.websocket.ws_manager import manager
 
 
@@ -22,6 +31,15 @@ from app.websocket.ws_manager import manager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long the main geofence lookup is reused before querying again
+GEOFENCE_CACHE_TTL_SECONDS = 60
+
+# Coordinate change (degrees, roughly 1 cm) below which a cattle position counts as unchanged
+POSITION_EPSILON_DEGREES = 1e-7
+
+# Longest the violation task waits for a cattle change before re-checking is_running
+VIOLATION_CHECK_MAX_WAIT_SECONDS = 10
+
 
 class BackgroundTaskManager:
     """
@@ -32,10 +50,16 @@ class BackgroundTaskManager:
         self.simulation_task = None
         self.violation_check_task = None
         self.heatmap_task = None
+        self._task_group_task = None
         self.is_running = False
         self.last_cattle_update = None
         self.last_violation_check = None
         self.last_heatmap_update = None
+        self._main_geofence_cache: Optional[Tuple[Optional[uuid.UUID], float]] = None
+        self._cattle_dirty = asyncio.Event()
+        self._cattle_dirty_for_violations = asyncio.Event()
+        self._last_heatmap_digest: Optional[bytes] = None
+        self._last_broadcast: Dict[uuid.UUID, Tuple[float, float, str]] = {}
 
     async def start_simulation(self, app: FastAPI):
         """
@@ -51,23 +75,35 @@ class BackgroundTaskManager:
         self.is_running = True
         logger.info("Starting background tasks...")
 
-        # Start cattle simulation task
-        self.simulation_task = asyncio.create_task(
-            self.simulate_cattle_movement_task(app)
-        )
+        # Run an initial violation check without waiting for the first movement
+        self._cattle_dirty_for_violations.set()
 
-        # Start violation detection task
-        self.violation_check_task = asyncio.create_task(
-            self.violation_detection_task(app)
-        )
-
-        # Start heatmap update task
-        self.heatmap_task = asyncio.create_task(
-            self.heatmap_update_task(app)
-        )
+        # Supervise all tasks in one TaskGroup; yield once so the group creates them
+        self._task_group_task = asyncio.create_task(self._run_task_group(app))
+        await asyncio.sleep(0)
 
         logger.info("All background tasks started")
 
+    async def _run_task_group(self, app: FastAPI):
+        """
+        Run the simulation, violation and heatmap tasks in a single TaskGroup
+
+        The first task to fail cancels its siblings; cancelling this coroutine cancels all of them.
+
+        Args:
+            app: FastAPI application instance
+        """
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                self.simulation_task = task_group.create_task(self.simulate_cattle_movement_task(app))
+                self.violation_check_task = task_group.create_task(self.violation_detection_task(app))
+                self.heatmap_task = task_group.create_task(self.heatmap_update_task(app))
+        except* Exception as error_group:
+            for error in error_group.exceptions:
+                logger.error(f"Fatal error in background task: {error}")
+        finally:
+            self.is_running = False
+
     async def stop_simulation(self):
         """
         Stop all background tasks
@@ -78,21 +114,14 @@ class BackgroundTaskManager:
         self.is_running = False
         logger.info("Stopping background tasks...")
 
-        # Cancel all tasks
-        if self.simulation_task:
-            self.simulation_task.cancel()
-        if self.violation_check_task:
-            self.violation_check_task.cancel()
-        if self.heatmap_task:
-            self.heatmap_task.cancel()
-
-        # Wait for tasks to complete
-        await asyncio.gather(
-            self.simulation_task,
-            self.violation_check_task,
-            self.heatmap_task,
-            return_exceptions=True
-        )
+        # Cancelling the supervisor cancels every task in its group and waits for them
+        if self._task_group_task:
+            self._task_group_task.cancel()
+            try:
+                await self._task_group_task
+            except asyncio.CancelledError:
+                pass
+            self._task_group_task = None
 
         logger.info("All background tasks stopped")
 
@@ -104,41 +133,48 @@ class BackgroundTaskManager:
             app: FastAPI application instance
         """
         logger.info("Starting cattle movement simulation task...")
+        loop = asyncio.get_running_loop()
 
         try:
             while self.is_running:
-                # Get database session
-                db = SessionLocal()
-                try:
-                    # Get main geofence (first active one)
-                    from app.models.geofence import Geofence
-                    main_geofence = db.query(Geofence).filter(Geofence.is_active == True).first()
-                    geofence_id = main_geofence.id if main_geofence else None
-
-                    # Simulate cattle movement
-                    service = CattleSimulationService(db)
-                    updated_cattle = service.update_all_cattle_positions(geofence_id)
-
-                    if updated_cattle:
-                        logger.info(f"Updated positions for {len(updated_cattle)} cattle")
-
-                        # Broadcast cattle updates
-                        await self._broadcast_cattle_updates(updated_cattle)
-                        self.last_cattle_update = datetime.utcnow()
-
-                except Exception as e:
-                    logger.error(f"Error in cattle movement simulation: {e}")
-                finally:
-                    db.close()
-
-                # Wait before next update (2-5 seconds random)
-                import random
-                await asyncio.sleep(random.uniform(2, 5))
+                # One database session per tick, shared by every call below
+                with SessionLocal() as db:
+                    try:
+                        # Get main geofence (first active one)
+                        geofence_id = await self._get_main_geofence_id(db)
+
+                        # Simulate cattle movement off the event loop
+                        service = CattleSimulationService(db)
+                        updated_cattle = await asyncio.to_thread(service.update_all_cattle_positions, geofence_id)
+
+                        if updated_cattle:
+                            logger.info(f"Updated positions for {len(updated_cattle)} cattle")
+
+                            # Broadcast cattle updates and let the violation task re-check
+                            await self._broadcast_cattle_updates(updated_cattle, db)
+                            self.last_cattle_update = datetime.utcnow()
+                            self._cattle_dirty_for_violations.set()
+
+                    except Exception as e:
+                        logger.error(f"Error in cattle movement simulation: {e}")
+
+                # Until the next simulation tick (2-5 seconds random), broadcast cattle
+                # changes made through the API as they happen, without moving the herd
+                next_tick = loop.time() + random.uniform(2, 5)
+                while self.is_running:
+                    remaining = next_tick - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._cattle_dirty.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    self._cattle_dirty.clear()
+                    await self._broadcast_changed_cattle()
 
         except asyncio.CancelledError:
             logger.info("Cattle movement simulation task cancelled")
-        except Exception as e:
-            logger.error(f"Fatal error in cattle movement simulation: {e}")
+            raise
 
     async def violation_detection_task(self, app: FastAPI):
         """
@@ -151,35 +187,40 @@ class BackgroundTaskManager:
 
         try:
             while self.is_running:
-                # Get database session
-                db = SessionLocal()
+                # Only check once cattle have moved (or geofences changed) since the last check
                 try:
-                    # Check for violations
-                    service = GeofenceService(db)
-                    violations = service.detect_all_violations()
+                    await asyncio.wait_for(
+                        self._cattle_dirty_for_violations.wait(),
+                        timeout=VIOLATION_CHECK_MAX_WAIT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                self._cattle_dirty_for_violations.clear()
 
-                    if violations:
-                        logger.warning(f"Detected {len(violations)} geofence violations")
+                # One database session per tick, shared by every call below
+                with SessionLocal() as db:
+                    try:
+                        # Prepare geofence boundaries once per tick, then check violations off the event loop
+                        service = GeofenceService(db)
+                        prepared_geofences = await asyncio.to_thread(service.build_prepared_geofences)
+                        violations = await asyncio.to_thread(service.detect_all_violations, prepared_geofences)
 
-                        # Broadcast violation alerts
-                        await self._broadcast_violation_alerts(violations)
-                        self.last_violation_check = datetime.utcnow()
+                        if violations:
+                            logger.warning(f"Detected {len(violations)} geofence violations")
 
-                    # Also check for new violations (compare with previous state)
-                    await self._check_new_violations(db)
+                            # Broadcast violation alerts
+                            await self._broadcast_violation_alerts(violations, db)
+                            self.last_violation_check = datetime.utcnow()
 
-                except Exception as e:
-                    logger.error(f"Error in violation detection: {e}")
-                finally:
-                    db.close()
+                        # Also check for new violations (compare with previous state)
+                        await self._check_new_violations(db)
 
-                # Wait before next check (10 seconds)
-                await asyncio.sleep(10)
+                    except Exception as e:
+                        logger.error(f"Error in violation detection: {e}")
 
         except asyncio.CancelledError:
             logger.info("Violation detection task cancelled")
-        except Exception as e:
-            logger.error(f"Fatal error in violation detection: {e}")
+            raise
 
     async def heatmap_update_task(self, app: FastAPI):
         """
@@ -198,67 +239,217 @@ class BackgroundTaskManager:
                 if not self.is_running:
                     break
 
-                # Get database session
-                db = SessionLocal()
-                try:
-                    # Generate latest heatmap data
-                    service = HeatmapService(db)
-                    heatmap_data = service.get_heatmap_data(hours_back=1, grid_size_meters=100)
+                # One database session per tick, shared by every call below
+                with SessionLocal() as db:
+                    try:
+                        # Generate latest heatmap data off the event loop
+                        service = HeatmapService(db)
+                        heatmap_data = await asyncio.to_thread(
+                            service.get_heatmap_data, hours_back=1, grid_size_meters=100
+                        )
 
-                    # Broadcast heatmap refresh
-                    await self._broadcast_heatmap_refresh(heatmap_data)
-                    self.last_heatmap_update = datetime.utcnow()
+                        # Broadcast heatmap refresh
+                        await self._broadcast_heatmap_refresh(heatmap_data)
+                        self.last_heatmap_update = datetime.utcnow()
 
-                    logger.info("Broadcasted heatmap update")
+                        logger.info("Broadcasted heatmap update")
 
-                except Exception as e:
-                    logger.error(f"Error in heatmap update: {e}")
-                finally:
-                    db.close()
+                    except Exception as e:
+                        logger.error(f"Error in heatmap update: {e}")
 
         except asyncio.CancelledError:
             logger.info("Heatmap update task cancelled")
-        except Exception as e:
-            logger.error(f"Fatal error in heatmap update: {e}")
+            raise
+
+    async def _get_main_geofence_id(self, db: Session) -> Optional[uuid.UUID]:
+        """
+        Get the ID of the main geofence, reusing the cached value within the TTL
+
+        Args:
+            db: Database session
+
+        Returns:
+            Geofence ID, or None if no geofence is active
+        """
+        if self._main_geofence_cache is not None:
+            geofence_id, cached_at = self._main_geofence_cache
+            if time.monotonic() - cached_at < GEOFENCE_CACHE_TTL_SECONDS:
+                return geofence_id
+
+        geofence_id = await asyncio.to_thread(self._query_main_geofence_id, db)
+        self._main_geofence_cache = (geofence_id, time.monotonic())
+        return geofence_id
+
+    def notify_cattle_changed(self):
+        """
+        Broadcast cattle changed through the API and re-check violations, without waiting for the next tick
+
+        The simulation task only broadcasts on this signal; simulated movement stays on its own timer.
+        """
+        self._cattle_dirty.set()
+        self._cattle_dirty_for_violations.set()
+
+    def invalidate_geofence_cache(self):
+        """
+        Drop the cached main geofence so the next tick queries it again, and re-check violations
+        """
+        self._main_geofence_cache = None
+        self._cattle_dirty_for_violations.set()
+
+    @staticmethod
+    def _query_main_geofence_id(db: Session) -> Optional[uuid.UUID]:
+        """
+        Query the ID of the main geofence (first active one)
+
+        Args:
+            db: Database session
+
+        Returns:
+            Geofence ID, or None if no geofence is active
+        """
+        main_geofence = db.query(Geofence).filter(Geofence.is_active == True).first()
+        return main_geofence.id if main_geofence else None
+
+    @staticmethod
+    def _query_cattle_columns(db: Session, cattle_ids: Optional[List[uuid.UUID]] = None) -> Dict[str, list]:
+        """
+        Read cattle positions as column arrays with a single query
+
+        Args:
+            db: Database session
+            cattle_ids: Optional cattle IDs to restrict to; all located cattle if omitted
+
+        Returns:
+            Dictionary of parallel lists: ids, lats, lngs, statuses and t (last update time)
+        """
+        query = select(
+            Cattle.id, ST_Y(Cattle.location), ST_X(Cattle.location), Cattle.health_status, Cattle.last_update
+        ).where(Cattle.location.isnot(None))
+        if cattle_ids is not None:
+            query = query.where(Cattle.id.in_(cattle_ids))
+        rows = db.execute(query).all()
+
+        ids, lats, lngs, statuses, timestamps = (
+            (list(values) for values in zip(*rows)) if rows else ([], [], [], [], [])
+        )
+        return {"ids": ids, "lats": lats, "lngs": lngs, "statuses": statuses, "t": timestamps}
+
+    @classmethod
+    def _serialize_cattle(cls, updated_cattle: List, db: Session) -> Dict[str, list]:
+        """
+        Build column arrays of updated cattle positions with a single query
+
+        Args:
+            updated_cattle: List of updated cattle objects
+            db: Database session
+
+        Returns:
+            Dictionary of parallel lists, as returned by _query_cattle_columns
+        """
+        # Identity keys are read without reloading the instances expired by the commit
+        cattle_ids = [inspect(cattle).identity[0] for cattle in updated_cattle]
+        return cls._query_cattle_columns(db, cattle_ids)
+
+    def _changed_cattle_columns(self, cattle_columns: Dict[str, list]) -> Dict[str, list]:
+        """
+        Keep only cattle whose position or status differs from the last broadcast, and record them
+
+        Args:
+            cattle_columns: Parallel lists of cattle, as returned by _query_cattle_columns
+
+        Returns:
+            The same columns restricted to changed cattle
+        """
+        changed = []
+        rows = zip(cattle_columns["ids"], cattle_columns["lats"], cattle_columns["lngs"], cattle_columns["statuses"])
+        for index, (cattle_id, lat, lng, status) in enumerate(rows):
+            previous = self._last_broadcast.get(cattle_id)
+            if (previous is None or previous[2] != status
+                    or abs(previous[0] - lat) > POSITION_EPSILON_DEGREES
+                    or abs(previous[1] - lng) > POSITION_EPSILON_DEGREES):
+                changed.append(index)
+                self._last_broadcast[cattle_id] = (lat, lng, status)
 
-    async def _broadcast_cattle_updates(self, updated_cattle: List):
+        return {key: [values[index] for index in changed] for key, values in cattle_columns.items()}
+
+    async def _broadcast_cattle_updates(self, updated_cattle: List, db: Session):
         """
-        Broadcast cattle position updates to connected WebSocket clients
+        Broadcast changed cattle positions to connected WebSocket clients
 
         Args:
             updated_cattle: List of updated cattle objects
+            db: Database session used to read the new positions
         """
         try:
-            cattle_list = [cattle.to_dict(include_location=True) for cattle in updated_cattle]
+            cattle_columns = await asyncio.to_thread(self._serialize_cattle, updated_cattle, db)
+
+            # Only send cattle that actually moved or changed status since the last broadcast
+            cattle_columns = self._changed_cattle_columns(cattle_columns)
+            if not cattle_columns["ids"]:
+                return
 
-            await manager.broadcast_cattle_update(cattle_list)
-            logger.debug(f"Broadcasted cattle update for {len(cattle_list)} cattle")
+            await manager.broadcast_cattle_update(cattle_columns)
+            logger.debug(f"Broadcasted cattle update for {len(cattle_columns['ids'])} cattle")
 
         except Exception as e:
             logger.error(f"Error broadcasting cattle updates: {e}")
 
-    async def _broadcast_violation_alerts(self, violations: List[Dict[str, Any]]):
+    async def _broadcast_changed_cattle(self):
+        """
+        Broadcast cattle whose stored position or status changed outside the simulation
+        """
+        try:
+            with SessionLocal() as db:
+                cattle_columns = await asyncio.to_thread(self._query_cattle_columns, db)
+
+            cattle_columns = self._changed_cattle_columns(cattle_columns)
+            if cattle_columns["ids"]:
+                await manager.broadcast_cattle_update(cattle_columns)
+                logger.debug(f"Broadcasted cattle update for {len(cattle_columns['ids'])} changed cattle")
+
+        except Exception as e:
+            logger.error(f"Error broadcasting changed cattle: {e}")
+
+    async def send_cattle_snapshot(self, websocket: WebSocket):
+        """
+        Send all current cattle positions to a newly connected client
+
+        Later broadcasts only carry changed cattle, so each client starts from a full snapshot.
+
+        Args:
+            websocket: Newly connected WebSocket
+        """
+        try:
+            with SessionLocal() as db:
+                cattle_columns = await asyncio.to_thread(self._query_cattle_columns, db)
+
+            await manager.send_personal_message(manager.cattle_update_message(cattle_columns), websocket)
+
+        except Exception as e:
+            logger.error(f"Error sending cattle snapshot: {e}")
+
+    async def _broadcast_violation_alerts(self, violations: List[Dict[str, Any]], db: Session):
         """
         Broadcast violation alerts to connected WebSocket clients
 
         Args:
             violations: List of violation dictionaries
+            db: Database session reused for every alert
         """
         try:
+            # Build every alert with the caller's session, then send them as a single batch frame
+            service = GeofenceService(db)
+            events = []
             for violation in violations:
                 # Create detailed alert
-                from app.services.geofence_service import GeofenceService
-                db = SessionLocal()
-                try:
-                    service = GeofenceService(db)
-                    alert = service.create_violation_alert(
-                        uuid.UUID(violation['cattle_id']),
-                        violation
-                    )
-                    await manager.broadcast_violation_alert(alert)
-                    logger.warning(f"Broadcasted violation alert for {violation['identifier']}")
-                finally:
-                    db.close()
+                alert = service.create_violation_alert(
+                    uuid.UUID(violation['cattle_id']),
+                    violation
+                )
+                events.append(manager.violation_alert_message(alert))
+
+            await manager.broadcast_batch(events)
+            logger.warning(f"Broadcasted {len(events)} violation alerts")
 
         except Exception as e:
             logger.error(f"Error broadcasting violation alerts: {e}")
@@ -289,7 +480,17 @@ class BackgroundTaskManager:
             # Extract relevant heatmap points for broadcasting
             heatmap_points = heatmap_data.get('heatmap_points', [])
 
+            # Skip the broadcast when the heatmap is identical to the last one sent
+            digest = hashlib.blake2b(
+                orjson.dumps(heatmap_points, option=orjson.OPT_SERIALIZE_NUMPY),
+                digest_size=16
+            ).digest()
+            if digest == self._last_heatmap_digest:
+                logger.debug("Heatmap unchanged, skipping refresh broadcast")
+                return
+
             await manager.broadcast_heatmap_refresh(heatmap_points)
+            self._last_heatmap_digest = digest
             logger.debug(f"Broadcasted heatmap refresh with {len(heatmap_points)} points")
 
         except Exception as e:
@@ -329,43 +530,39 @@ class BackgroundTaskManager:
         Args:
             geofence_id: Optional geofence ID to constrain movement
         """
-        db = SessionLocal()
-        try:
-            service = CattleSimulationService(db)
-            updated_cattle = service.update_all_cattle_positions(geofence_id)
+        with SessionLocal() as db:
+            try:
+                service = CattleSimulationService(db)
+                updated_cattle = await asyncio.to_thread(service.update_all_cattle_positions, geofence_id)
 
-            if updated_cattle:
-                await self._broadcast_cattle_updates(updated_cattle)
-                self.last_cattle_update = datetime.utcnow()
+                if updated_cattle:
+                    await self._broadcast_cattle_updates(updated_cattle, db)
+                    self.last_cattle_update = datetime.utcnow()
 
-            return f"Updated positions for {len(updated_cattle)} cattle"
+                return f"Updated positions for {len(updated_cattle)} cattle"
 
-        except Exception as e:
-            logger.error(f"Error in manual cattle update: {e}")
-            return f"Error: {str(e)}"
-        finally:
-            db.close()
+            except Exception as e:
+                logger.error(f"Error in manual cattle update: {e}")
+                return f"Error: {str(e)}"
 
     async def manual_violation_check(self):
         """
         Manually trigger a violation check
         """
-        db = SessionLocal()
-        try:
-            service = GeofenceService(db)
-            violations = service.detect_all_violations()
+        with SessionLocal() as db:
+            try:
+                service = GeofenceService(db)
+                violations = await asyncio.to_thread(service.detect_all_violations)
 
-            if violations:
-                await self._broadcast_violation_alerts(violations)
-                self.last_violation_check = datetime.utcnow()
+                if violations:
+                    await self._broadcast_violation_alerts(violations, db)
+                    self.last_violation_check = datetime.utcnow()
 
-            return f"Detected {len(violations)} violations"
+                return f"Detected {len(violations)} violations"
 
-        except Exception as e:
-            logger.error(f"Error in manual violation check: {e}")
-            return f"Error: {str(e)}"
-        finally:
-            db.close()
+            except Exception as e:
+                logger.error(f"Error in manual violation check: {e}")
+                return f"Error: {str(e)}"
 
 
 # Global background task manager instance
@@ -393,6 +590,7 @@ async def startup_event(app: FastAPI):
         app: FastAPI application instance
     """
     logger.info("🚀 Starting Sumbawa Digital Ranch background tasks...")
+    await asyncio.to_thread(check_resource_stats_view)
     await background_manager.start_simulation(app)
 
 
@@ -480,8 +678,8 @@ def register_task_management_routes(app: FastAPI):
         if _app_global is None:
             raise HTTPException(status_code=500, detail="Application not initialized")
 
+        # stop_simulation waits for the cancelled tasks, so they can be recreated immediately
         await background_manager.stop_simulation()
-        await asyncio.sleep(1)  # Brief pause
         await background_manager.start_simulation(_app_global)
 
         return {
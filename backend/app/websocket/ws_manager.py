@@ -2,15 +2,52 @@
 WebSocket manager for real-time cattle tracking updates
 Handles multiple client connections and broadcasts real-time data
 """
-import json
+import asyncio
 import logging
-from typing import List
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import orjson
 from fastapi import WebSocket
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Numpy scalars/arrays and naive datetimes can appear in service payloads
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+# Number of clients sent to concurrently before yielding back to the event loop
+BROADCAST_CHUNK_SIZE = 50
+
+# Formatted timestamp reused for every message within the same second
+_ts_cache = {"sec": 0, "str": ""}
+
+
+def _now_iso() -> str:
+    """
+    Current UTC time as an ISO 8601 string, cached at 1 second resolution
+    Returns:
+        Timestamp string such as 2025-11-27T10:29:00Z
+    """
+    sec = int(time.time())
+    if sec != _ts_cache["sec"]:
+        _ts_cache["sec"] = sec
+        _ts_cache["str"] = datetime.fromtimestamp(sec, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return _ts_cache["str"]
+
+
+def _dumps(message: dict) -> bytes:
+    """
+    Serialize a message to UTF-8 JSON bytes with orjson
+    Args:
+        message: Dictionary message to serialize
+    Returns:
+        Encoded JSON payload
+    """
+    return orjson.dumps(message, option=_ORJSON_OPTIONS)
+
 
 class ConnectionManager:
     """
@@ -19,7 +56,7 @@ class ConnectionManager:
     """
 
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Dict[int, WebSocket] = {}  # Keyed by id(websocket)
         self.connection_info = {}  # Store connection metadata
 
     async def connect(self, websocket: WebSocket):
@@ -29,9 +66,9 @@ class ConnectionManager:
             websocket: WebSocket connection instance
         """
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections[id(websocket)] = websocket
         self.connection_info[id(websocket)] = {
-            "connected_at": "2025-11-27T10:29:00Z",  # Will be dynamic
+            "connected_at": _now_iso(),
             "client_info": websocket.client
         }
         logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
@@ -49,10 +86,8 @@ class ConnectionManager:
         Args:
             websocket: WebSocket connection instance to remove
         """
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-            if id(websocket) in self.connection_info:
-                del self.connection_info[id(websocket)]
+        if self.active_connections.pop(id(websocket), None) is not None:
+            self.connection_info.pop(id(websocket), None)
             logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
@@ -63,63 +98,105 @@ class ConnectionManager:
             websocket: Target WebSocket connection
         """
         try:
-            await websocket.send_text(json.dumps(message))
+            await websocket.send_bytes(_dumps(message))
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
             # Remove problematic connection
             await self.disconnect(websocket)
 
-    async def broadcast(self, message: str):
+    async def broadcast(self, payload: bytes):
         """
-        Broadcast message to all connected clients
+        Broadcast a pre-encoded payload to all connected clients
         Args:
-            message: String message to broadcast
+            payload: Encoded message, serialized once and sent as-is to every client
         """
         if not self.active_connections:
             return
 
+        # Send to each chunk of clients concurrently, yielding between chunks
+        connections = list(self.active_connections.values())
         disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
+        for start in range(0, len(connections), BROADCAST_CHUNK_SIZE):
+            chunk = connections[start:start + BROADCAST_CHUNK_SIZE]
+            results = await asyncio.gather(
+                *(connection.send_bytes(payload) for connection in chunk),
+                return_exceptions=True
+            )
+            for connection, result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error broadcasting to client: {result}")
+                    disconnected.append(connection)
+            if start + BROADCAST_CHUNK_SIZE < len(connections):
+                await asyncio.sleep(0)
 
         # Remove disconnected clients
         for connection in disconnected:
             await self.disconnect(connection)
 
-    async def broadcast_cattle_update(self, cattle_list: List[dict]):
+    @staticmethod
+    def cattle_update_message(cattle_columns: Dict[str, list]) -> dict:
         """
-        Broadcast cattle position updates to all clients
+        Build a cattle update message
         Args:
-            cattle_list: List of cattle with updated positions
+            cattle_columns: Parallel lists of cattle (ids, lats, lngs, statuses, t)
+        Returns:
+            Message dictionary of type cattle_update
         """
-        message = {
+        return {
             "type": "cattle_update",
             "data": {
-                "cattle": cattle_list,
-                "timestamp": "2025-11-27T10:29:00Z",  # Will be dynamic
-                "count": len(cattle_list)
+                "cattle": cattle_columns,
+                "timestamp": _now_iso(),
+                "count": len(cattle_columns["ids"])
             }
         }
-        await self.broadcast(json.dumps(message))
 
-    async def broadcast_violation_alert(self, alert_data: dict):
+    async def broadcast_cattle_update(self, cattle_columns: Dict[str, list]):
         """
-        Broadcast geofence violation alerts
+        Broadcast cattle position updates to all clients
+        Args:
+            cattle_columns: Parallel lists of updated cattle (ids, lats, lngs, statuses, t)
+        """
+        await self.broadcast(_dumps(self.cattle_update_message(cattle_columns)))
+
+    @staticmethod
+    def violation_alert_message(alert_data: dict) -> dict:
+        """
+        Build a violation alert message
         Args:
             alert_data: Alert information including cattle ID, location, etc.
+        Returns:
+            Message dictionary of type violation_alert
         """
-        message = {
+        return {
             "type": "violation_alert",
             "data": {
                 "alert": alert_data,
-                "timestamp": "2025-11-27T10:29:00Z"  # Will be dynamic
+                "timestamp": _now_iso()
             }
         }
-        await self.broadcast(json.dumps(message))
+
+    async def broadcast_violation_alert(self, alert_data: dict):
+        """
+        Broadcast geofence violation alerts
+        Args:
+            alert_data: Alert information including cattle ID, location, etc.
+        """
+        await self.broadcast(_dumps(self.violation_alert_message(alert_data)))
+
+    async def broadcast_batch(self, events: List[dict]):
+        """
+        Broadcast several messages to all clients as one batch frame
+        Args:
+            events: List of messages, each shaped like a single broadcast message
+        """
+        if not events:
+            return
+        message = {
+            "type": "batch",
+            "events": events
+        }
+        await self.broadcast(_dumps(message))
 
     async def broadcast_heatmap_refresh(self, heatmap_data: List[dict]):
         """
@@ -131,10 +208,10 @@ class ConnectionManager:
             "type": "heatmap_refresh",
             "data": {
                 "heatmap": heatmap_data,
-                "timestamp": "2025-11-27T10:29:00Z"  # Will be dynamic
+                "timestamp": _now_iso()
             }
         }
-        await self.broadcast(json.dumps(message))
+        await self.broadcast(_dumps(message))
 
     async def broadcast_system_status(self, status_data: dict):
         """
@@ -146,10 +223,10 @@ class ConnectionManager:
             "type": "system_status",
             "data": {
                 "status": status_data,
-                "timestamp": "2025-11-27T10:29:00Z"  # Will be dynamic
+                "timestamp": _now_iso()
             }
         }
-        await self.broadcast(json.dumps(message))
+        await self.broadcast(_dumps(message))
 
     def get_connection_stats(self) -> dict:
         """
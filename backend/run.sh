@@ -40,6 +40,9 @@ echo "🔌 WebSocket endpoint: ws://localhost:8000/ws"
 uvicorn app.main:app \
     --host 0.0.0.0 \
     --port 8000 \
+    --loop auto \
+    --ws websockets \
+    --ws-per-message-deflate true \
     --reload \
     --log-level info \
     --access-log \
@@ -15,6 +15,7 @@ class WebSocketService {
     this.maxReconnectAttempts = 5
     this.reconnectDelay = 1000
     this.heartbeatInterval = null
+    this.decoder = new TextDecoder()
   }
 
   connect() {
@@ -26,6 +27,8 @@ class WebSocketService {
       try {
         this.connectionStatus.value = 'connecting'
         this.ws = new WebSocket(this.url)
+        // Server sends pre-encoded JSON as binary frames
+        this.ws.binaryType = 'arraybuffer'
 
         this.ws.onopen = () => {
           console.log('WebSocket connected to:', this.url)
@@ -38,8 +41,14 @@ class WebSocketService {
 
         this.ws.onmessage = (event) => {
           try {
-            const message = JSON.parse(event.data)
-            this.emit('message', message)
+            const text = typeof event.data === 'string' ? event.data : this.decoder.decode(event.data)
+            const message = JSON.parse(text)
+            // Batch frames carry several messages; deliver each one individually
+            if (message.type === 'batch') {
+              message.events.forEach(item => this.emit('message', item))
+            } else {
+              this.emit('message', message)
+            }
           } catch (error) {
             console.error('Failed to parse WebSocket message:', error)
           }
@@ -219,15 +219,19 @@ export const useCattleStore = defineStore('cattle', {
     },
 
     // Update multiple cattle (batch update from WebSocket)
+    // Payload is column-oriented: { ids, lats, lngs, statuses, t } with one entry per changed cattle
     updateCattleData(cattleUpdates) {
-      if (Array.isArray(cattleUpdates)) {
-        cattleUpdates.forEach(update => {
-          const index = this.cattleList.findIndex(c => c.id === update.id)
-          if (index >= 0) {
+      if (cattleUpdates && Array.isArray(cattleUpdates.ids)) {
+        const { ids, lats, lngs, statuses, t } = cattleUpdates
+        const indexById = new Map(this.cattleList.map((c, i) => [c.id, i]))
+        ids.forEach((id, i) => {
+          const index = indexById.get(id)
+          if (index !== undefined) {
             this.cattleList[index] = {
               ...this.cattleList[index],
-              ...update,
-              lastUpdate: new Date().toISOString()
+              location: { lat: lats[i], lng: lngs[i] },
+              healthStatus: statuses[i],
+              lastUpdate: t[i] || new Date().toISOString()
             }
           }
         })